@@ -246,7 +246,7 @@ def convert(input):
 
     loc = 0
     for k in range(gcount):
-        ext_dat = numpy.fromstring(dat[loc:loc+data_size], dtype=_code)
+        ext_dat = numpy.frombuffer(dat[loc:loc+data_size], dtype=_code).copy()
         ext_dat = ext_dat.reshape(_shape)
         if _uint16:
             ext_dat += _bzero
@@ -278,7 +278,7 @@ def convert(input):
         arr_stack[k] = ext_dat
         #ext_hdu = fits.hdu.ImageHDU(data=ext_dat)
 
-        rec = numpy.fromstring(dat[loc+data_size:loc+group_size], dtype=formats)
+        rec = numpy.frombuffer(dat[loc+data_size:loc+group_size], dtype=formats)
 
         loc += group_size
 
@@ -34,18 +34,73 @@
         This command will convert the input ASCII trailer file test1.tra to
         a waivered-FITS file test1_trl.fits.
 
+        If the optional ``fitsio`` package is installed it is used to write
+        the output FITS table, which is considerably faster than
+        ``astropy.io.fits`` for large trailer files.  Set the environment
+        variable ``CONVERTLOG_NO_FITSIO`` to always write with
+        ``astropy.io.fits`` instead.
+
 """
 # Developed by Science Software Branch, STScI, USA.
 import os
+import re
 import sys
 from astropy.io import fits
 import numpy as np
 
-import textwrap
+try:
+    import fitsio
+except ImportError:
+    fitsio = None
+
+if 'CONVERTLOG_NO_FITSIO' in os.environ:
+    fitsio = None
 
 __version__ = "1.0 (7 Jan, 2016), \xa9 AURA"
 
 
+# Compiled text-wrapping patterns, keyed by width
+_WRAP_RE = {}
+
+
+def _wrap_pattern(width):
+    """Return the compiled pattern used to wrap text at ``width``.
+
+    The first alternative matches the longest run of text ending in a
+    non-blank character that fits within ``width`` and is followed by
+    blanks or the end of the line; the second one skips blanks that
+    would leave no room for the word after them; the third one splits
+    words that are longer than ``width``.  No alternative crosses a
+    newline.
+
+    """
+    pattern = _WRAP_RE.get(width)
+    if pattern is None:
+        pattern = re.compile(r'(.{{0,{0}}}\S)(?:[^\S\n]+|$)|[^\S\n]+|(.{{{1}}})'
+                             .format(width - 1, width), re.MULTILINE)
+        _WRAP_RE[width] = pattern
+    return pattern
+
+
+def wrap_text(text, width):
+    """Split text into chunks no wider than ``width``.
+
+    Each line of ``text`` is wrapped separately: chunks are cut at the
+    last blank that fits within ``width`` characters.  A word that does
+    not fit in the rest of a chunk starts a new one, and only a word
+    with no blank within ``width`` characters is split, every ``width``
+    characters.  Hyphens are not break points.  Indentation is kept
+    unless the first word would not fit after it, in which case it is
+    dropped.  Trailing whitespace is dropped and blank lines produce no
+    chunks.
+
+    """
+    for head, word in _wrap_pattern(width).findall(text.expandtabs()):
+        chunk = head or word
+        if chunk and not chunk.isspace():
+            yield chunk
+
+
 def convert(input, width=132, output=None, keep=False):
 
     """Input ASCII trailer file "input" will be read.
@@ -72,15 +127,17 @@ def convert(input, width=132, output=None, keep=False):
         [Default: False]
 
     """
-    # open input trailer file
+    # read the whole input trailer file at once
     trl = open(input)
-
-    # process all lines
-    lines = np.array([i for text in trl.readlines() for i in textwrap.wrap(text,width=width)])
-
-    # close ASCII trailer file now that we have processed all the lines
+    text = trl.read()
     trl.close()
 
+    # process all lines straight into the fixed-width byte strings used
+    # by the FITS table column
+    lines = np.fromiter((i.encode('ascii', 'replace')
+                         for i in wrap_text(text, width)),
+                        dtype='S{}'.format(width))
+
     if output is None:
         # create fits file
         rootname,suffix = os.path.splitext(input)
@@ -90,18 +147,26 @@ def convert(input, width=132, output=None, keep=False):
         fitsname = output
     full_name = os.path.abspath(os.path.join(os.path.curdir,fitsname))
 
-    old_file = os.path.exists(full_name)
-    if old_file:
-        if keep:
-            print("ERROR: Trailer file already written out as: {}".format(full_name))
-            raise IOError
-        else:
-            os.remove(full_name)
+    if keep and os.path.exists(full_name):
+        print("ERROR: Trailer file already written out as: {}".format(full_name))
+        raise IOError
 
-    # Build FITS table and write it out
-    line_fmt = "{}A".format(width)
-    tbhdu = fits.BinTableHDU.from_columns([fits.Column(name='TEXT_FILE',format=line_fmt,array=lines)])
-    tbhdu.writeto(fitsname)
+    # Build FITS table and write it out to a temporary file first, then
+    # move it into place so that any previous file is replaced atomically
+    tmpname = fitsname + '.tmp'
+    try:
+        if fitsio is not None:
+            with fitsio.FITS(tmpname, 'rw', clobber=True) as fout:
+                fout.write_table([lines], names=['TEXT_FILE'])
+        else:
+            line_fmt = "{}A".format(width)
+            tbhdu = fits.BinTableHDU.from_columns([fits.Column(name='TEXT_FILE',format=line_fmt,array=lines)])
+            tbhdu.writeto(tmpname, overwrite=True)
+        os.replace(tmpname, fitsname)
+    except Exception:
+        if os.path.exists(tmpname):
+            os.remove(tmpname)
+        raise
 
     print("Created output FITS filename for trailer:{}    {}".format(os.linesep,full_name))
 
@@ -111,9 +111,11 @@ to multi-extension FITS format; no output file is generated;
 the returned ``HDUList`` is in multi-extension format.
 
 """
+import contextlib
 import os
 import sys
 
+import numpy as np
 from astropy.io import fits
 
 __version__ = "1.1 (15 June, 2015)"
@@ -258,9 +260,8 @@ def _verify(waiveredHdul):
                 #
                 # The Alternate HDU must be a TableHDU
                 #
-                if waiveredHdul[0].data.shape[0] == \
-                        waiveredHdul[1].data.shape[0] or \
-                        waiveredHdul[1].data.shape[0] == 1:
+                nrows = waiveredHdul[1].data.shape[0]
+                if waiveredHdul[0].data.shape[0] == nrows or nrows == 1:
                     #
                     # The number of arrays in the Primary HDU must match
                     # the number of rows in the TableHDU.  This includes
@@ -274,6 +275,39 @@ def _verify(waiveredHdul):
                      " FITS file")
 
 
+def _columnValues(column, format, unit):
+    """
+        Convert the values of a waivered FITS table column into the
+        values of the corresponding extension header cards.
+
+        Parameters:
+
+           column           array of values from the table column
+
+           format           format of the table column
+
+           unit             unit of the table column
+
+        Returns: list of header card values, one per table row
+
+        Exceptions: NONE
+    """
+
+    if unit == 'LOGICAL-':
+        #
+        # Handle logical values
+        #
+        return (np.char.strip(column) == 'T').tolist()
+    elif format[0] == 'E':
+        #
+        # Handle floating point values
+        #
+        fmt = '%' + format[1:] + 'G'
+        return [eval(fmt % value) for value in column.astype(float)]  # nosec
+    else:
+        return list(column)
+
+
 def toMultiExtensionFits(waiveredObject,
                          multiExtensionFileName=None,
                          forceFileOutput=False,
@@ -316,22 +350,65 @@ def toMultiExtensionFits(waiveredObject,
         Input object is not a ``astropy.io.fits.HDUList``, a file object or a file name
     """
 
-    if isinstance(waiveredObject, fits.HDUList):
-        whdul = waiveredObject
-        inputObjectDescription = "HDUList object"
-    else:
-        try:
-            whdul = fits.open(waiveredObject)
-            if isinstance(waiveredObject, str):
-                inputObjectDescription = "file " + waiveredObject
-            else:
-                inputObjectDescription = "file " + waiveredObject.name
-        except TypeError:
-            raise TypeError("Input object must be HDUList, file object, " + \
-                            "or file name")
+    with contextlib.ExitStack() as stack:
+        if isinstance(waiveredObject, fits.HDUList):
+            whdul = waiveredObject
+            inputObjectDescription = "HDUList object"
+        else:
+            try:
+                whdul = fits.open(waiveredObject)
+                if isinstance(waiveredObject, str):
+                    #
+                    # Close the file opened here once the conversion is
+                    # done; file objects provided by the caller are left
+                    # open
+                    #
+                    stack.enter_context(whdul)
+                    inputObjectDescription = "file " + waiveredObject
+                else:
+                    inputObjectDescription = "file " + waiveredObject.name
+            except TypeError:
+                raise TypeError("Input object must be HDUList, file object, " + \
+                                "or file name")
+
+        return _toMultiExtensionFits(whdul, inputObjectDescription,
+                                     multiExtensionFileName,
+                                     forceFileOutput, verbose)
+
+
+def _toMultiExtensionFits(whdul, inputObjectDescription,
+                          multiExtensionFileName, forceFileOutput, verbose):
+    """
+        Convert an open waivered FITS HDUList to a multi-extension FITS
+        HDUList object and write it out if requested.
+
+        Parameters:
+
+           whdul                   waivered FITS HDUList to be converted
+
+           inputObjectDescription  description of the input object used
+                                   in the verbose output
+
+           multiExtensionFileName  file specification for the output file
+
+           forceFileOutput         force the generation of an output file
+                                   when multiExtensionFileName is None
+
+           verbose                 provide verbose output
+
+        Returns: multi-extension FITS HDUList object
+
+        Exceptions:
+
+           ValueError       Input HDUList is not for a waivered FITS file
+    """
 
     _verify(whdul)
 
+    tbl_hdr = whdul[1].header
+    tbl_data = whdul[1].data
+    nrows = tbl_data.shape[0]
+
     undesiredPrimaryHeaderKeywords = ['ORIGIN', 'FITSDATE', 'FILENAME',
                                       'ALLG-MAX', 'ALLG-MIN', 'ODATTYPE',
                                       'SDASMGNU', 'OPSIZE', 'CTYPE2',
@@ -378,8 +455,7 @@ def toMultiExtensionFits(waiveredObject,
     # Add the NEXTEND card.  There will be one extension
     # for each row in the wavered Fits file table HDU.
     #
-    mPHdu.header['NEXTEND'] = (whdul[1].data.shape[0],
-                               'Number of standard extensions')
+    mPHdu.header['NEXTEND'] = (nrows, 'Number of standard extensions')
     #
     # Create the multi-extension file HDUList from the primary header
     #
@@ -389,7 +465,17 @@ def toMultiExtensionFits(waiveredObject,
     # will be one extension for each row in the wavered file's table.
     #
     instrument = mPHeader.get('INSTRUME', '')
-    nrows = whdul[1].data.shape[0]
+    #
+    # Convert the table columns into header card values one column at
+    # a time rather than one table cell at a time
+    #
+    descr = {n: tbl_hdr[n] for n in wcols.names if n in tbl_hdr}
+    cards = []
+    for keyword, format, unit in zip(wcols.names, wcols.formats, wcols.units):
+        values = _columnValues(tbl_data.field(keyword), format, unit)
+        cards.append((keyword, values, descr.get(keyword, "")))
+
+    imageData = whdul[0].data
 
     for i in range(0, nrows):
         #
@@ -399,43 +485,25 @@ def toMultiExtensionFits(waiveredObject,
             #
             # Handle case where there is only one row in the table
             #
-            data = whdul[0].data
+            data = imageData
         else:
-            data = whdul[0].data[i]
+            data = imageData[i]
 
-        mhdul.append(fits.ImageHDU(data))
+        hdu = fits.ImageHDU(data)
+        mhdul.append(hdu)
+        hdr = hdu.header
         #
         # Add cards to the header for each keyword in the column
         # names of the secondary HDU table from the wavered file
         #
-        for keyword, format, unit in zip(wcols.names, wcols.formats, wcols.units):
-            if unit == 'LOGICAL-':
-                #
-                # Handle logical values
-                #
-                if whdul[1].data.field(keyword)[i].strip() == 'T':
-                    d = True
-                else:
-                    d = False
-            elif format[0] == 'E':
-                #
-                # Handle floating point values
-                #
-                fmt = '%' + format[1:] + 'G'
-                d = eval(fmt % float(whdul[1].data.field(keyword)[i]))  # nosec
-            else:
-                d = whdul[1].data.field(keyword)[i]
-
-            kw_descr = ""
-            if keyword in whdul[1].header:
-                kw_descr = whdul[1].header[keyword]
-            mhdul[i + 1].header[keyword] = (d, kw_descr)
+        for keyword, values, kw_descr in cards:
+            hdr[keyword] = (values[i], kw_descr)
         #
         # If original data is unsigned short then scale the data.
         #
         if originalDataType == 'USHORT':
-            mhdul[i + 1].scale('int16', '', bscale=1, bzero=32768)
-            mhdul[i + 1].header.set('BSCALE', value=1, before='BZERO')
+            hdu.scale('int16', '', bscale=1, bzero=32768)
+            hdr.set('BSCALE', value=1, before='BZERO')
         #
         # For WFPC2 and FOS instruments require additional header cards
         #
@@ -443,35 +511,28 @@ def toMultiExtensionFits(waiveredObject,
             #
             # Add EXTNAME card to header
             #
-            mhdul[i + 1].header['EXTNAME'] = (mPHeader.get('FILETYPE', ''),
-                                              'extension name')
+            hdr['EXTNAME'] = (mPHeader.get('FILETYPE', ''), 'extension name')
             #
             # Add EXTVER card to the header
             #
-            mhdul[i + 1]._extver = i + 1
-            mhdul[i + 1].header.set('EXTVER', value=i + 1,
-                                    comment='extension version number',
-                                    after='EXTNAME')
+            hdu._extver = i + 1
+            hdr.set('EXTVER', value=i + 1,
+                    comment='extension version number', after='EXTNAME')
             #
             # Add the EXPNAME card to the header
             #
-            mhdul[i + 1].header.set('EXPNAME',
-                                    mPHeader.get('ROOTNAME', ''),
-                                    '9 character exposure identifier',
-                                    before='EXTVER')
+            hdr.set('EXPNAME', mPHeader.get('ROOTNAME', ''),
+                    '9 character exposure identifier', before='EXTVER')
             #
             # Add the INHERIT card to the header.
             #
-            mhdul[i + 1].header.set('INHERIT', True,
-                                    'inherit the primary header',
-                                    after='EXTVER')
+            hdr.set('INHERIT', True, 'inherit the primary header',
+                    after='EXTVER')
             #
             # Add the ROOTNAME card to the header
             #
-            mhdul[i + 1].header.set('ROOTNAME',
-                                    mPHeader.get('ROOTNAME', ''),
-                                    'rootname of the observationset',
-                                    after='INHERIT')
+            hdr.set('ROOTNAME', mPHeader.get('ROOTNAME', ''),
+                    'rootname of the observationset', after='INHERIT')
 
     if not multiExtensionFileName and forceFileOutput:
         base, ext = os.path.splitext(whdul[0]._file.name)
@@ -558,11 +619,46 @@ def convertwaiveredfits(waiveredObject,
 # *****************************************************************************
 #
 
+def _convertFile(f, outputfile, conversionFormat, verbose):
+    """
+        Convert a single waivered FITS file and write out the result.
+
+        Parameters:
+
+           f                file specification of the file to convert
+
+           outputfile       file specification for the output file or None
+
+           conversionFormat string indicating the conversion format
+
+           verbose          flag indicating if verbose output is desired
+
+        Returns: None
+
+        Exceptions: NONE
+    """
+
+    convertwaiveredfits(f, outputfile, True, conversionFormat, verbose)
+
+
 def main():
     files, outputFiles, conversionFormat, verbose = _processCommandLineArgs()
 
-    for f, outputfile in zip(files, outputFiles):
-        convertwaiveredfits(f, outputfile, True, conversionFormat, verbose)
+    tasks = [(f, outputfile, conversionFormat, verbose)
+             for f, outputfile in zip(files, outputFiles)]
+
+    if len(tasks) > 1:
+        #
+        # Each file is converted independently, so spread the
+        # conversions over a pool of worker processes
+        #
+        from multiprocessing import Pool
+
+        with Pool(min(len(tasks), os.cpu_count() or 1)) as pool:
+            pool.starmap(_convertFile, tasks)
+    else:
+        for task in tasks:
+            _convertFile(*task)
 
     sys.exit()
 
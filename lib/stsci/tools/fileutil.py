@@ -16,6 +16,9 @@ General functions included are::
     decimal_date(date-obs,time-obs=None)
         Converts the DATE-OBS (with optional TIME-OBS) string into a decimal year
 
+    decimal_date_array(date-obs,time-obs=None)
+        Converts arrays of DATE-OBS (and TIME-OBS) strings into decimal years
+
     buildRootname(filename, extn=None, extlist=None)
 
     buildNewRootname(filename, ext=None)
@@ -39,6 +42,9 @@ General functions included are::
          Opens file and returns PyFITS object.
          It will work on both FITS and GEIS formatted images.
 
+    close_fully(fimg)
+         Closes a PyFITS object along with any memory-mapped data arrays.
+
     findFile(input)
 
     checkFileExists(filename,directory=None)
@@ -71,12 +77,17 @@ IRAF compatibility functions (abbreviated list)::
     access(filename)
         Returns true if file exists, where filename can include IRAF variables
 """
+from astropy.io import fits as _fits
+
 from . import stpyfits as fits
 from . import readgeis
 from . import convertwaiveredfits
 
 import datetime
-import copy
+import fnmatch
+import functools
+import io
+import math
 import os
 import re
 import shutil
@@ -99,6 +110,20 @@ EXTLIST = ['_crj.fits', '_flt.fits', '_flc.fits', '_sfl.fits', '_cal.fits',
            '_raw.fits', '.c0h', '.hhh', '_c0h.fits', '_c0f.fits', '_c1f.fits',
            '.fits']
 
+
+def _compileSuffixes(suffixes):
+    """Compile a regular expression matching any of the given suffixes."""
+
+    return re.compile('|'.join(re.escape(suffix) for suffix in suffixes))
+
+
+# Regular expression matching any of the default file types
+_re_extlist = _compileSuffixes(EXTLIST)
+
+# File name endings recognized as FITS files by `isFits`
+_FITS_SUFFIXES = ('fits', 'fit', 'FITS', 'FIT')
+
+
 BLANK_ASNDICT = {
     'output': None,
     'order': [],
@@ -129,11 +154,11 @@ def RADTODEG(rad):
 
 
 def DIVMOD(num,val):
-    if isinstance(num, np.ndarray):
-    # Treat number as numpy object
-        _num = np.remainder(num, val)
-    else:
-        _num = divmod(num, val)[1]
+    _num = np.remainder(num, val)
+    if isinstance(_num, np.generic) and np.isscalar(num) and \
+            not isinstance(num, np.generic):
+        # Return Python scalars for Python scalar input
+        _num = _num.item()
     return _num
 
 
@@ -165,54 +190,236 @@ def decimal_date(dateobs, timeobs=None):
     """Convert DATE-OBS (and optional TIME-OBS) into a decimal year."""
 
     year, month, day = dateobs.split('-')
+    year = int(year)
+    # day of year, computed directly rather than through strftime("%j")
+    yday = (datetime.date(year, int(month), int(day)) -
+            datetime.date(year, 1, 1)).days + 1
+
     if timeobs is not None:
         hr, min, sec = timeobs.split(':')
+        rtime = datetime.time(int(hr), int(min), int(sec))
+        dday = (yday + rtime.hour / 24.0 + rtime.minute / (60. * 24) +
+                rtime.second / (3600 * 24.)) / 365.25
     else:
-        hr, min, sec = 0, 0, 0
-
-    rdate = datetime.datetime(int(year), int(month), int(day), int(hr),
-                              int(min), int(sec))
-    dday = (float(rdate.strftime("%j")) + rdate.hour / 24.0 +
-            rdate.minute / (60. * 24) + rdate.second / (3600 * 24.)) / 365.25
-    ddate = int(year) + dday
+        dday = yday / 365.25
+    ddate = year + dday
 
     return ddate
 
 
+def decimal_date_array(dateobs, timeobs=None):
+    """
+    Convert arrays of DATE-OBS (and optional TIME-OBS) strings into decimal
+    years.
+
+    This is a vectorized version of `decimal_date` for ISO formatted
+    ('YYYY-MM-DD' and 'HH:MM:SS') values, returning the same values as a
+    NumPy array::
+
+        >>> dates = decimal_date_array(['2004-02-29', '2010-07-01'],
+        ...                            ['12:00:00', '23:59:59'])
+        >>> dates.tolist() == [decimal_date('2004-02-29', '12:00:00'),
+        ...                    decimal_date('2010-07-01', '23:59:59')]
+        True
+
+    """
+
+    dates = np.asarray(dateobs, dtype='datetime64[D]')
+    years = dates.astype('datetime64[Y]')
+    yday = (dates - years).astype(np.int64) + 1
+
+    if timeobs is not None:
+        stamps = np.char.add(np.char.add(dates.astype(str), 'T'),
+                             np.asarray(timeobs, dtype=str))
+        secs = (stamps.astype('datetime64[s]') - dates).astype(np.int64)
+        hr, secs = np.divmod(secs, 3600)
+        min, sec = np.divmod(secs, 60)
+        dday = (yday + hr / 24.0 + min / (60. * 24) +
+                sec / (3600 * 24.)) / 365.25
+    else:
+        dday = yday / 365.25
+
+    return years.astype(np.int64) + 1970 + dday
+
+
 def interpretDQvalue(input):
     """
     Converts an integer 'input' into its component bit values as a list of
     power of 2 integers.
 
-    For example, the bit value 1027 would return [1, 2, 1024]
+    For example, the bit value 1027 would return [1, 2, 1024]::
+
+        >>> interpretDQvalue(1027)
+        [1, 2, 1024]
+
     """
 
-    nbits = 16
-    # We will only support integer values up to 2**128
-    for iexp in [16, 32, 64, 128]:
-        # Find out whether the input value is less than 2**iexp
-        if (input // (2 ** iexp)) == 0:
-            # when it finally is, we have identified how many bits can be used to
-            # describe this input bitvalue
-            nbits = iexp
-            break
-
-    # Find out how 'dtype' values are described on this machine
-    a = np.zeros(1, dtype='int16')
-    atype_descr = a.dtype.descr[0][1]
-    # Use this description to build the description we need for our input integer
-    dtype_str = atype_descr[:2] + str(nbits // 8)
-    result = np.zeros(nbits + 1, dtype=dtype_str)
-
-    # For each bit, determine whether it has been set in the input value or not
-    for n in range(nbits + 1):
-        i = 2 ** n
-        if input & i > 0:
-            # record which bit has been set as the power-of-2 integer
-            result[n] = i
-
-    # Return the non-zero unique values as a Python list
-    return np.delete(np.unique(result), 0).tolist()
+    value = int(input)
+    # Unpack the bytes of the value (least significant first) into
+    # individual bits and report the position of every bit that is set.
+    nbytes = max(1, (value.bit_length() + 7) // 8)
+    bits = np.unpackbits(np.frombuffer(value.to_bytes(nbytes, 'little'),
+                                       dtype=np.uint8), bitorder='little')
+    return [1 << n for n in np.flatnonzero(bits).tolist()]
+
+
+def interpretDQvalueArray(input):
+    """
+    Converts an array of integer DQ values into their component bit values.
+
+    This is the array counterpart of `interpretDQvalue`.  The result has one
+    more (last) axis than 'input', with one entry for each bit of its integer
+    type: the power of 2 value of that bit where it is set in the DQ value,
+    and 0 where it is not.
+
+    For example::
+
+        >>> interpretDQvalueArray(np.array([5, 130], dtype=np.uint8))
+        array([[  1,   0,   4,   0,   0,   0,   0,   0],
+               [  0,   2,   0,   0,   0,   0,   0, 128]], dtype=uint8)
+
+    """
+
+    values = np.asarray(input)
+    if values.dtype.kind not in 'iu':
+        values = values.astype(np.int64)
+    # Work on the unsigned type of the same size, so that the highest bit of
+    # signed values comes out as a positive power of 2
+    utype = np.dtype('u{:d}'.format(values.dtype.itemsize))
+    values = values.astype(utype, copy=False)
+    powers = np.left_shift(utype.type(1),
+                           np.arange(8 * utype.itemsize, dtype=utype))
+    return np.bitwise_and(values[..., np.newaxis], powers)
+
+
+# Size of a FITS logical record and of a single header card
+_FITS_BLOCK = 2880
+_FITS_CARD = 80
+
+# Quoted string value of a header card, allowing for embedded ''
+_re_card_string = re.compile(r"'(?:[^']|'')*'")
+
+
+def _readHeaderCards(fh):
+    """
+    Read the header starting at the current position of the open binary
+    file ``fh`` and return a dictionary mapping keywords to raw value
+    strings, along with the ``(keyword, value)`` of the first card.
+
+    The file is left positioned at the start of the data following the
+    header.  Returns ``(None, None)`` if the end of the file is reached
+    before a complete header has been read.
+    """
+
+    cards = {}
+    first = None
+    while True:
+        block = fh.read(_FITS_BLOCK)
+        if len(block) < _FITS_BLOCK:
+            return None, None
+        for i in range(0, _FITS_BLOCK, _FITS_CARD):
+            card = block[i:i + _FITS_CARD].decode('ascii', 'replace')
+            keyword = card[:8].rstrip()
+            if keyword == 'END':
+                return cards, first
+            if card[8:10] == '= ':
+                # Strip any comment from the value field
+                field = card[10:].lstrip()
+                mm = _re_card_string.match(field)
+                if mm is not None:
+                    value = mm.group()
+                else:
+                    value = field.split('/', 1)[0].strip()
+                cards.setdefault(keyword, value)
+                if first is None:
+                    first = (keyword, value)
+
+
+def _cardString(value):
+    """Return the string held by a raw quoted header card value."""
+
+    return value[1:-1].replace("''", "'").rstrip()
+
+
+def _dataSize(cards):
+    """Return the size in bytes of the data described by header ``cards``."""
+
+    naxis = int(cards.get('NAXIS', '0'))
+    if naxis == 0:
+        return 0
+    size = int(cards.get('PCOUNT', '0'))
+    npix = 1
+    for n in range(1, naxis + 1):
+        npix *= int(cards['NAXIS%d' % n])
+    return (abs(int(cards['BITPIX'])) // 8 * int(cards.get('GCOUNT', '1')) *
+            (size + npix))
+
+
+def _skipData(fh, cards):
+    """Move ``fh`` past the padded data described by header ``cards``."""
+
+    fh.seek(-(-_dataSize(cards) // _FITS_BLOCK) * _FITS_BLOCK, os.SEEK_CUR)
+
+
+def _iterFitsHeaders(filename):
+    """
+    Yield the header cards (as returned by `_readHeaderCards`) of every HDU
+    in a FITS file, reading the headers directly and skipping over the data
+    without parsing the file with `astropy.io.fits`.
+
+    Raises `ValueError` if the file does not look like a standard FITS file,
+    so that the caller can fall back to using `astropy.io.fits`.
+    """
+
+    with open(filename, 'rb') as fh:
+        cards, first = _readHeaderCards(fh)
+        if cards is None or first != ('SIMPLE', 'T') or \
+                cards.get('GROUPS') == 'T':
+            raise ValueError('Not a standard FITS primary header')
+        while cards is not None:
+            yield cards
+            _skipData(fh, cards)
+            cards, first = _readHeaderCards(fh)
+            if cards is not None and first[0] != 'XTENSION':
+                raise ValueError('Not a standard FITS extension header')
+
+
+def _sniffFitsType(filename):
+    """
+    Classify a FITS file as 'mef', 'waiver' or 'simple' by reading its
+    primary header and the start of the following extension directly,
+    without parsing the file with `astropy.io.fits`.
+
+    Raises `ValueError` for anything but a plain primary header followed
+    by at most one extension header, so that the caller can fall back to
+    the full `astropy.io.fits` based check.
+    """
+
+    with open(filename, 'rb') as fh:
+        cards, first = _readHeaderCards(fh)
+        if cards is None or first != ('SIMPLE', 'T') or \
+                cards.get('GROUPS') == 'T':
+            raise ValueError('Not a standard FITS primary header')
+
+        if int(cards.get('NAXIS', '0')) == 0:
+            # Constant value arrays (see stpyfits) have data but no pixels
+            # stored in the file.
+            if 'PIXVALUE' not in cards or 'NPIX1' not in cards:
+                return 'mef'
+        elif _dataSize(cards) == 0:
+            raise ValueError('Empty primary data array')
+
+        # Skip over the padded data array to the next extension header, if any
+        _skipData(fh, cards)
+        card = fh.read(_FITS_CARD)
+
+    if not card:
+        return 'simple'
+    if not card.startswith(b'XTENSION= '):
+        raise ValueError('Unexpected data after primary HDU')
+    if card[10:].split(b'/', 1)[0].strip(b" '") == b'TABLE':
+        return 'waiver'
+    return None
 
 
 def isFits(input):
@@ -238,7 +445,6 @@ def isFits(input):
 
     isfits = False
     fitstype = None
-    names = ['fits', 'fit', 'FITS', 'FIT']
     #determine if input is a fits file based on extension
     # Only check type of FITS file if filename ends in valid FITS string
     f = None
@@ -247,21 +453,27 @@ def isFits(input):
         isfits = True
         f = input
     else:
-        isfits = True in [input.endswith(l) for l in names]
+        isfits = input.endswith(_FITS_SUFFIXES)
 
     # if input is a fits file determine what kind of fits it is
     #waiver fits len(shape) == 3
     if isfits:
         if f is None:
             try:
-                f = fits.open(input, mode='readonly')
+                return isfits, _sniffFitsType(input)
+            except ValueError:
+                # Let astropy deal with anything out of the ordinary
+                pass
+            try:
+                f = fits.open(input, mode='readonly', memmap=False)
                 fileclose = True
             except Exception:
                 if f is not None:
                     f.close()
                 raise
-        data0 = f[0].data
-        if data0 is not None:
+        # Only look at the headers; accessing the data of the primary HDU
+        # could read in the whole array just to find out if it exists.
+        if f[0].header['NAXIS'] > 0:
             try:
                 if isinstance(f[1], fits.TableHDU):
                     fitstype = 'waiver'
@@ -277,11 +489,10 @@ def isFits(input):
 
 def buildRotMatrix(theta):
     _theta = DEGTORAD(theta)
-    _mrot = np.zeros(shape=(2,2), dtype=np.float64)
-    _mrot[0] = (np.cos(_theta), np.sin(_theta))
-    _mrot[1] = (-np.sin(_theta), np.cos(_theta))
+    _cos = math.cos(_theta)
+    _sin = math.sin(_theta)
 
-    return _mrot
+    return np.array([[_cos, _sin], [-_sin, _cos]], dtype=np.float64)
 
 
 #################
@@ -291,7 +502,27 @@ def buildRotMatrix(theta):
 #
 #
 #################
-def verifyWriteMode(files):
+def _isWritable(fname):
+    """
+    Return True if `fname` could be opened for appending, without opening it.
+    """
+    if os.path.exists(fname):
+        return not os.path.isdir(fname) and os.access(fname, os.W_OK)
+    # Appending to a file which does not exist yet creates it
+    return os.access(os.path.dirname(fname) or os.curdir, os.W_OK)
+
+
+def _canOpenForAppend(fname):
+    """Return True if `fname` can actually be opened for appending."""
+    try:
+        f = open(fname, 'a')
+        f.close()
+    except Exception:
+        return False
+    return True
+
+
+def verifyWriteMode(files, strict=False):
     """
     Checks whether files are writable. It is up to the calling routine to raise
     an Exception, if desired.
@@ -299,6 +530,11 @@ def verifyWriteMode(files):
     This function returns True, if all files are writable and False, if any are
     not writable.  In addition, for all files found to not be writable, it will
     print out the list of names of affected files.
+
+    Write permission is checked with `os.access`.  Setting `strict` to True
+    instead opens each file for appending, which also catches failures that
+    only show up on an actual open (for example, with some ACL setups), at the
+    cost of a full open and close for each file.
     """
 
     # Start by insuring that input is a list of filenames,
@@ -307,19 +543,11 @@ def verifyWriteMode(files):
     if not isinstance(files, list):
         files = [files]
 
-    # Keep track of the name of each file which is not writable
-    not_writable = []
-    writable = True
+    check = _canOpenForAppend if strict else _isWritable
 
-    # Check each file in input list
-    for fname in files:
-        try:
-            f = open(fname,'a')
-            f.close()
-            del f
-        except:
-            not_writable.append(fname)
-            writable = False
+    # Keep track of the name of each file which is not writable
+    not_writable = [fname for fname in files if not check(fname)]
+    writable = not not_writable
 
     if not writable:
         print('The following file(s) do not have write permission!')
@@ -329,6 +557,16 @@ def verifyWriteMode(files):
     return writable
 
 
+# Keyword names of the filters used by each instrument
+_FILTER_KEYWORDS = {
+    'ACS': ['FILTER1', 'FILTER2'],
+    'WFPC2': ['FILTNAM1', 'FILTNAM2'],
+    'STIS': ['OPT_ELEM', 'FILTER'],
+    'NICMOS': ['FILTER', 'FILTER2'],
+    'WFC3': ['FILTER', 'FILTER2']
+}
+
+
 def getFilterNames(header, filternames=None):
     """
     Returns a comma-separated string of filter names extracted from the input
@@ -344,15 +582,6 @@ def getFilterNames(header, filternames=None):
     names for their instrument, in the case their instrument is not supported.
     """
 
-    # Define the keyword names for each instrument
-    _keydict = {
-        'ACS': ['FILTER1', 'FILTER2'],
-        'WFPC2': ['FILTNAM1', 'FILTNAM2'],
-        'STIS': ['OPT_ELEM', 'FILTER'],
-        'NICMOS': ['FILTER', 'FILTER2'],
-        'WFC3': ['FILTER', 'FILTER2']
-    }
-
     # Find out what instrument the input header came from, based on the
     # 'INSTRUME' keyword
     if 'INSTRUME' in header:
@@ -360,11 +589,8 @@ def getFilterNames(header, filternames=None):
     else:
         raise ValueError('Header does not contain INSTRUME keyword.')
 
-    # Check to make sure this instrument is supported in _keydict
-    if instrument in _keydict:
-        _filtlist = _keydict[instrument]
-    else:
-        _filtlist = filternames
+    # Check to make sure this instrument is supported in _FILTER_KEYWORDS
+    _filtlist = _FILTER_KEYWORDS.get(instrument, filternames)
 
     # At this point, we know what keywords correspond to the filter names
     # in the header.  Now, get the values associated with those keywords.
@@ -372,12 +598,9 @@ def getFilterNames(header, filternames=None):
     # blank keywords. Values containing 'CLEAR' or 'N/A' are valid.
     _filter_values = []
     for _key in _filtlist:
-        if _key in header:
-            _val = header[_key]
-        else:
-            _val = ''
+        _val = header.get(_key, '')
         if _val.strip() != '':
-            _filter_values.append(header[_key])
+            _filter_values.append(_val)
 
     # Return the comma-separated list
     return ','.join(_filter_values)
@@ -395,24 +618,25 @@ def buildNewRootname(filename, extn=None, extlist=None):
     """
 
     # Search known suffixes to replace ('_crj.fits',...)
-    _extlist = copy.deepcopy(EXTLIST)
+    _re_ext = _re_extlist
     # Also, add a default where '_dth.fits' replaces
     # whatever extension was there ('.fits','.c1h',...)
     #_extlist.append('.')
     # Also append any user-specified extensions...
     if extlist:
-        _extlist += extlist
+        _re_ext = _compileSuffixes(EXTLIST + list(extlist))
 
     if isinstance(filename, fits.HDUList):
         try:
             filename = filename.filename()
         except:
             raise ValueError("Can't determine the filename of an waivered HDUList object.")
-    for suffix in _extlist:
-        _indx = filename.find(suffix)
-        if _indx > 0: break
 
-    if _indx < 0:
+    # Find the first known suffix after the start of the name
+    mm = _re_ext.search(filename, 1)
+    if mm is not None:
+        _indx = mm.start()
+    else:
          # default to entire rootname
         _indx = len(filename)
 
@@ -422,6 +646,15 @@ def buildNewRootname(filename, extn=None, extlist=None):
     return filename[:_indx] + extn
 
 
+def _listdir(fpath):
+    """
+    Return the set of names of the files in directory ``fpath``.
+    """
+
+    with os.scandir(fpath) as entries:
+        return frozenset(entry.name for entry in entries if entry.is_file())
+
+
 def buildRootname(filename, ext=None):
     """
     Build a new rootname for an existing file and given extension.
@@ -450,53 +683,43 @@ def buildRootname(filename, ext=None):
     if fpath in ['', ' ', None]:
         fpath = os.curdir
     # Get complete list of filenames from current directory
-    flist = os.listdir(fpath)
+    flist = _listdir(fpath)
 
     #First, assume given filename is complete and verify
     # it exists...
     rootname = None
 
-    for name in flist:
-        if name == froot:
-            rootname = froot
-            break
-        elif name == froot + '.fits':
-            rootname = froot + '.fits'
-            break
+    if froot in flist:
+        rootname = froot
+    elif froot + '.fits' in flist:
+        rootname = froot + '.fits'
 
     # If we have an incomplete filename, try building a default
     # name and seeing if it exists...
     #
     # Set up default list of suffix/extensions to add to rootname
-    _extlist = []
-    for extn in EXTLIST:
-        _extlist.append(extn)
+    _extlist = list(EXTLIST)
 
     if rootname is None:
         # Add any user-specified extension to list of extensions...
         if ext is not None:
             for i in ext:
                 _extlist.insert(0,i)
+        froot_lower = froot.lower()
         # loop over all extensions looking for a filename that matches...
         for extn in _extlist:
             # Start by looking for filename with exactly
             # the same case a provided in ASN table...
             rname = froot + extn
-            for name in flist:
-                if rname == name:
-                    rootname = name
-                    break
-            if rootname is None:
-                # Try looking for all lower-case filename
-                # instead of a mixed-case filename as required
-                # by the pipeline.
-                rname = froot.lower() + extn
-                for name in flist:
-                    if rname == name:
-                        rootname = name
-                        break
-
-            if rootname is not None:
+            if rname in flist:
+                rootname = rname
+                break
+            # Try looking for all lower-case filename
+            # instead of a mixed-case filename as required
+            # by the pipeline.
+            rname = froot_lower + extn
+            if rname in flist:
+                rootname = rname
                 break
 
     # If we still haven't found the file, see if we have the
@@ -614,8 +837,6 @@ def getHeader(filename, handle=None):
 
     if not (_extn is None or (_extn.isdigit() and int(_extn) == 0)):
         # Append correct extension/chip/group header to PRIMARY...
-        #for _card in getExtn(_fimg,_extn).header.ascard:
-            #_hdr.ascard.append(_card)
         for _card in getExtn(_fimg, _extn).header.cards:
             _hdr.append(_card)
     if not handle:
@@ -660,6 +881,44 @@ def buildFITSName(geisname):
     return _fitsname
 
 
+# Largest estimated FITS file size (in bytes) which `_writeFits` will
+# assemble in memory before writing it to disk in a single call.
+_BUFFERED_WRITE_LIMIT = 64 * 1024 * 1024
+
+
+def _writeFits(hdul, fitsname, overwrite=False):
+    """
+    Write `hdul` to `fitsname`.
+
+    The file is written under a temporary name and then moved into place, so
+    that readers never see a partially written file.  Files smaller than
+    `_BUFFERED_WRITE_LIMIT` are serialized into memory first and written out
+    with a single system call, instead of one small write for each header and
+    data block.
+    """
+    if not overwrite and os.path.exists(fitsname):
+        raise OSError('File {!r} already exists.'.format(fitsname))
+
+    size = sum(len(hdu.header) * 80 +
+               (hdu.data.nbytes if hdu.data is not None else 0)
+               for hdu in hdul)
+
+    tmpname = fitsname + '.tmp'
+    try:
+        if size > _BUFFERED_WRITE_LIMIT:
+            hdul.writeto(tmpname, overwrite=True)
+        else:
+            buf = io.BytesIO()
+            hdul.writeto(buf)
+            with open(tmpname, 'wb') as f:
+                f.write(buf.getbuffer())
+        os.replace(tmpname, fitsname)
+    except Exception:
+        if os.path.exists(tmpname):
+            os.remove(tmpname)
+        raise
+
+
 def openImage(filename, mode='readonly', memmap=False, writefits=True,
               clobber=True, fitsname=None):
     """
@@ -733,10 +992,10 @@ def openImage(filename, mode='readonly', memmap=False, writefits=True,
                 fexists = os.path.exists(fitsname)
                 if (fexists and clobber) or not fexists:
                     print('Writing out WAIVERED as MEF to ', fitsname)
-                    fimg.writeto(fitsname, overwrite=clobber)
+                    _writeFits(fimg, fitsname, overwrite=clobber)
                     if dqexists:
                         print('Writing out WAIVERED as MEF to ', dqfitsname)
-                        dqfile.writeto(dqfitsname, overwrite=clobber)
+                        _writeFits(dqfile, dqfitsname, overwrite=clobber)
 
                 # Now close input GEIS image, and open writable
                 # handle to output FITS image instead...
@@ -781,10 +1040,10 @@ def openImage(filename, mode='readonly', memmap=False, writefits=True,
             fexists = os.path.exists(fitsname)
             if (fexists and clobber) or not fexists:
                 print('Writing out GEIS as MEF to ', fitsname)
-                fimg.writeto(fitsname, overwrite=clobber)
+                _writeFits(fimg, fitsname, overwrite=clobber)
                 if dqexists:
                     print('Writing out GEIS as MEF to ', dqfitsname)
-                    dqfile.writeto(dqfitsname, overwrite=clobber)
+                    _writeFits(dqfile, dqfitsname, overwrite=clobber)
             # Now close input GEIS image, and open writable
             # handle to output FITS image instead...
             fimg.close()
@@ -798,11 +1057,31 @@ def openImage(filename, mode='readonly', memmap=False, writefits=True,
         return fimg
 
 
+def close_fully(fimg):
+    """
+    Close PyFITS object `fimg` and release any memory-mapped data.
+
+    Closing an `HDUList` opened with ``memmap=True`` leaves the memory map,
+    and with it the file handle, open for as long as a data array refers to
+    it.  Deleting the data of each HDU first lets long loops over many files
+    avoid running out of file handles.
+    """
+    for hdu in fimg:
+        try:
+            del hdu.data
+        except AttributeError:
+            pass
+    fimg.close()
+
+
+@functools.lru_cache(maxsize=512)
 def parseFilename(filename):
     """
     Parse out filename from any specified extensions.
 
-    Returns rootname and string version of extension name.
+    Returns rootname and string version of extension name.  Results are
+    cached, since the same name is usually parsed again by each function
+    it gets passed on to.
     """
 
     # Parse out any extension specified in filename
@@ -863,20 +1142,20 @@ def countExtn(fimg, extname='SCI'):
     number of SCI extensions.
     """
 
-    closefits = False
     if isinstance(fimg, str):
-        fimg = fits.open(fimg)
-        closefits = True
-
-    n = 0
-    for e in fimg:
-        if 'extname' in e.header and e.header['extname'] == extname:
-            n += 1
-
-    if closefits:
-        fimg.close()
+        # Scan the headers in the file directly rather than building an
+        # HDUList just to look at one keyword of each header.
+        try:
+            return sum(1 for cards in _iterFitsHeaders(fimg)
+                       if 'EXTNAME' in cards and
+                       _cardString(cards['EXTNAME']) == extname)
+        except ValueError:
+            # Let astropy deal with anything out of the ordinary
+            pass
+        with fits.open(fimg) as f:
+            return countExtn(f, extname=extname)
 
-    return n
+    return sum(1 for e in fimg if e.header.get('EXTNAME') == extname)
 
 
 def getExtn(fimg, extn=None):
@@ -901,15 +1180,16 @@ def getExtn(fimg, extn=None):
                 break
     else:
         # An extension was provided, so parse it out...
-        if repr(extn).find(',') > 1:
-            if isinstance(extn, tuple):
+        if isinstance(extn, (tuple, list)) or (isinstance(extn, str) and
+                                               extn.find(',') > 0):
+            if isinstance(extn, str):
+                _extns = extn.split(',')
+            else:
                 # We have a tuple possibly created by parseExtn(), so
                 # turn it into a list for easier manipulation.
                 _extns = list(extn)
                 if '' in _extns:
                     _extns.remove('')
-            else:
-                _extns = extn.split(',')
             # Two values given for extension:
             #    for example, 'sci,1' or 'dq,1'
             try:
@@ -923,7 +1203,7 @@ def getExtn(fimg, extn=None):
                             hdr['extver'] == int(_extns[1])):
                         _extn = e
                         break
-        elif repr(extn).find('/') > 1:
+        elif isinstance(extn, str) and extn.find('/') > 0:
             # We are working with GEIS group syntax
             _indx = str(extn[:extn.find('/')])
             _extn = fimg[int(_indx)]
@@ -967,6 +1247,20 @@ def getExtn(fimg, extn=None):
     return _extn
 
 
+def _openHeaders(filename):
+    """
+    Open `filename` to look at its headers only.
+
+    Plain FITS files are opened with lazy loading of HDUs, so that only the
+    headers up to the one being looked for get read.  (stpyfits always turns
+    lazy loading off.)  Other images are opened with `openImage`.
+    """
+    isfits, fitstype = isFits(filename)
+    if isfits and fitstype != 'waiver':
+        return _fits.open(filename, lazy_load_hdus=True)
+    return openImage(filename)
+
+
 #Revision History:
 #    Nov 2001: findFile upgraded to accept full filenames with paths,
 #               instead of working only on files from current directory. WJH
@@ -984,53 +1278,29 @@ def findFile(input):
     # expanded out before splitting out the path...
     _fdir, _fname = os.path.split(osfn(input))
 
-    if _fdir == '':
-        _fdir = os.curdir
+    _root, _extn = parseFilename(_fname)
 
-    try:
-        flist = os.listdir(_fdir)
-    except OSError:
-        # handle when requested file in on a disconnect network store
+    # A single lstat is enough to find out whether the file exists, rather
+    # than listing the whole directory to look for its name.
+    if (_root in ('', os.curdir, os.pardir) or
+            not os.path.lexists(os.path.join(_fdir, _root))):
         return no
 
-    _root, _extn = parseFilename(_fname)
+    # Check to see if given extension, if any, exists
+    if _extn is None:
+        return yes
 
-    found = no
-    for name in flist:
-        if name == _root:
-            # Check to see if given extension, if any, exists
-            if _extn is None:
-                found = yes
-                continue
-            else:
-                _split = _extn.split(',')
-                _extnum = None
-                _extver = None
-                if  _split[0].isdigit():
-                    _extname = None
-                    _extnum = int(_split[0])
-                else:
-                    _extname = _split[0]
-                    if len(_split) > 1:
-                        _extver = int(_split[1])
-                    else:
-                        _extver = 1
-                f = openImage(_root)
-                f.close()
-                if _extnum is not None:
-                    if _extnum < len(f):
-                        found = yes
-                        del f
-                        continue
-                    else:
-                        del f
-                else:
-                    _fext = findExtname(f, _extname, extver=_extver)
-                    if _fext is not None:
-                        found = yes
-                        del f
-                        continue
-    return found
+    _split = _extn.split(',')
+    with _openHeaders(os.path.join(_fdir, _root)) as f:
+        if _split[0].isdigit():
+            try:
+                f[int(_split[0])]
+            except IndexError:
+                return no
+            return yes
+
+        _extver = int(_split[1]) if len(_split) > 1 else 1
+        return findExtname(f, _split[0], extver=_extver) is not None
 
 
 def checkFileExists(filename, directory=None):
@@ -1058,29 +1328,34 @@ def copyFile(input, output, replace=None):
 
 def _remove(file):
     # Check to see if file exists.  If not, return immediately.
-    if not findFile(file):
+    # A plain lstat is all that is needed here; findFile would also
+    # expand IRAF variables and open FITS files to check extensions.
+    if not os.path.lexists(file):
         return
 
-    if file.find('.fits') > 0:
+    if file.endswith(('.fits', '.fits.gz', '.fits.fz')):
         try:
             os.remove(file)
         except (IOError, OSError):
             pass
-    elif file.find('.imh') > 0:
+    elif file.endswith('.imh'):
         # Delete both .imh and .pix files
         os.remove(file)
         os.remove(file[:-3] + 'pix')
     else:
+        os.remove(file)
         # If we have a GEIS image that has separate header
         # and pixel files which need to be removed.
         # Assumption: filenames end in '.??h' and '.??d'
         #
-        os.remove(file)
         # At this point, we may be deleting a non-image
         # file, so only verify whether a GEIS hhd or similar
         # file exists before trying to delete it.
-        if findFile(file[:-1] + 'd'):
-            os.remove(file[:-1] + 'd')
+        if file[-4:-3] == '.' and file[-1:] == 'h':
+            try:
+                os.remove(file[:-1] + 'd')
+            except FileNotFoundError:
+                pass
 
 
 def removeFile(inlist):
@@ -1094,17 +1369,16 @@ def removeFile(inlist):
     if not isinstance(inlist, str):
     # We do have a list, so delete all filenames in list.
         # Treat like a list of full filenames
-        _ldir = os.listdir('.')
+        _ldir = None
         for f in inlist:
         # Now, check to see if there are wildcards which need to be expanded
-            if f.find('*') >= 0 or f.find('?') >= 0:
-                # We have a wild card specification
-                regpatt = f.replace('?', '.?')
-                regpatt = regpatt.replace('*', '.*')
-                _reg = re.compile(regpatt)
-                for file in _ldir:
-                    if _reg.match(file):
-                        _remove(file)
+            if '*' in f or '?' in f:
+                # We have a wild card specification; only list the
+                # directory once, the first time one is needed
+                if _ldir is None:
+                    _ldir = os.listdir('.')
+                for file in fnmatch.filter(_ldir, f):
+                    _remove(file)
             else:
                 # This is just a single filename
                 _remove(f)
@@ -1113,50 +1387,46 @@ def removeFile(inlist):
         _remove(inlist)
 
 
+# Marks a keyword missing from a header, as opposed to one with no value
+_NOT_FOUND = object()
+
+
 def findKeywordExtn(ft, keyword, value=None):
     """
     This function will return the index of the extension in a multi-extension
     FITS file which contains the desired keyword with the given value.
     """
 
-    i = 0
-    extnum = -1
     # Search through all the extensions in the FITS object
-    for chip in ft:
-        hdr = chip.header
+    for i, chip in enumerate(ft):
         # Check to make sure the extension has the given keyword
-        if keyword in hdr:
-            if value is not None:
-                # If it does, then does the value match the desired value
-                # MUST use 'str.strip' to match against any input string!
-                if hdr[keyword].strip() == value:
-                    extnum = i
-                    break
-            else:
-                extnum = i
-                break
-        i += 1
-    # Return the index of the extension which contained the
-    # desired EXTNAME value.
-    return extnum
+        val = chip.header.get(keyword, _NOT_FOUND)
+        if val is _NOT_FOUND:
+            continue
+        # If it does, then does the value match the desired value
+        # MUST use 'str.strip' to match against any input string!
+        if value is None or val.strip() == value:
+            # Return the index of the extension which contained the
+            # desired keyword value.
+            return i
+    return -1
 
 
 def findExtname(fimg, extname, extver=None):
     """
     Returns the list number of the extension corresponding to EXTNAME given.
+
+    Extensions without an EXTVER keyword are treated as having EXTVER = 1,
+    as in the FITS standard.
     """
 
-    i = 0
-    extnum = None
-    for chip in fimg:
+    extname = extname.upper()
+    for i, chip in enumerate(fimg):
         hdr = chip.header
-        if 'EXTNAME' in hdr:
-            if hdr['EXTNAME'].strip() == extname.upper():
-                if extver is None or hdr['EXTVER'] == extver:
-                    extnum = i
-                    break
-        i += 1
-    return extnum
+        if 'EXTNAME' in hdr and hdr['EXTNAME'].strip() == extname:
+            if extver is None or hdr.get('EXTVER', 1) == extver:
+                return i
+    return None
 
 
 def rAsciiLine(ifile):
@@ -1200,7 +1470,7 @@ _varDict = {}
 # module variables that don't get saved (they get
 # initialized when this module is imported)
 
-unsavedVars = [
+_unsavedVarsDict = frozenset([
     'EOF',
     '_NullFile',
     '_NullPath',
@@ -1209,7 +1479,6 @@ unsavedVars = [
     '__file__',
     '__name__',
     '__re_var_match',
-    '__re_var_match2',
     '__re_var_paren',
     '_badFormats',
     '_clearString',
@@ -1221,12 +1490,7 @@ unsavedVars = [
     'no',
     'yes',
     'userWorkingHome'
-]
-
-_unsavedVarsDict = {}
-for v in unsavedVars:
-    _unsavedVarsDict[v] = 1
-del unsavedVars, v
+])
 
 
 # -----------------------------------------------------
@@ -1266,42 +1530,37 @@ def listVars(prefix="", equals="\t= ", **kw):
 def untranslateName(s):
     """Undo Python conversion of CL parameter or variable name."""
 
-    s = s.replace('DOT', '.')
-    s = s.replace('DOLLAR', '$')
+    # Only build new strings for the substitutions actually needed
+    if 'DOT' in s:
+        s = s.replace('DOT', '.')
+    if 'DOLLAR' in s:
+        s = s.replace('DOLLAR', '$')
     # delete 'PY' at start of name components
     if s[:2] == 'PY': s = s[2:]
-    s = s.replace('.PY', '.')
+    if '.PY' in s:
+        s = s.replace('.PY', '.')
     return s
 
 
 def envget(var, default=None):
     """Get value of IRAF or OS environment variable."""
 
-    # set iraf to None so it knows to not use iraf's environment
-    iraf = None
-
+    # IRAF variables take precedence over the OS environment
+    if var in _varDict:
+        return _varDict[var]
     try:
-        if iraf:
-            return iraf.envget(var)
-        else:
-            raise KeyError
+        return os.environ[var]
     except KeyError:
-        try:
-            return _varDict[var]
-        except KeyError:
-            try:
-                return os.environ[var]
-            except KeyError:
-                if default is not None:
-                    return default
-                elif var == 'TERM':
-                    # Return a default value for TERM
-                    # TERM gets caught as it is found in the default
-                    # login.cl file setup by IRAF.
-                    print("Using default TERM value for session.")
-                    return 'xterm'
-                else:
-                    raise KeyError("Undefined environment variable `%s'" % var)
+        if default is not None:
+            return default
+        elif var == 'TERM':
+            # Return a default value for TERM
+            # TERM gets caught as it is found in the default
+            # login.cl file setup by IRAF.
+            print("Using default TERM value for session.")
+            return 'xterm'
+        else:
+            raise KeyError("Undefined environment variable `%s'" % var)
 
 
 def osfn(filename):
@@ -1316,7 +1575,11 @@ def osfn(filename):
     if filename is None:
         return filename
 
-    ename = Expand(filename)
+    # Names without any IRAF variables or '~' do not need to be expanded
+    if '$' in filename or '(' in filename or '~' in filename:
+        ename = Expand(filename)
+    else:
+        ename = filename
     dlist = [part.strip() for part in ename.split(os.sep)]
     if len(dlist) == 1 and dlist[0] not in [os.curdir, os.pardir]:
         return dlist[0]
@@ -1335,14 +1598,7 @@ def osfn(filename):
 def defvar(varname):
     """Returns true if CL variable is defined."""
 
-    # set iraf to None so it knows to not use iraf's environment
-    iraf = None
-
-    if iraf:
-        _irafdef = iraf.envget(varname)
-    else:
-        _irafdef = 0
-    return varname in _varDict or varname in os.environ or _irafdef
+    return varname in _varDict or varname in os.environ
 
 
 # -----------------------------------------------------
@@ -1436,12 +1692,13 @@ def time(**kw):
 # Input may also be a comma-separated list of strings to Expand,
 # in which case an expanded comma-separated list is returned.
 
-# search for leading string without embedded '$'
-__re_var_match = re.compile(r'(?P<varname>[^$]*)\$')
-__re_var_match2 = re.compile(r'\$(?P<varname>\w*)')
+# search for leading 'name$' or '$name' variable
+# (IRAF variable names are ASCII only)
+__re_var_match = re.compile(r'\$(?P<name>\w*)|(?P<varname>[^$]*)\$',
+                            re.ASCII)
 
 # search for string embedded in parentheses
-__re_var_paren = re.compile(r'\((?P<varname>[^()]*)\)')
+__re_var_paren = re.compile(r'\((?P<varname>[^()]*)\)', re.ASCII)
 
 
 def Expand(instring, noerror=0):
@@ -1468,30 +1725,29 @@ def Expand(instring, noerror=0):
 def _expand1(instring, noerror):
     """Expand a string with embedded IRAF variables (IRAF virtual filename)."""
 
-    # first expand names in parentheses
-    # note this works on nested names too, expanding from the
-    # inside out (just like IRAF)
-    mm = __re_var_paren.search(instring)
-    while mm is not None:
+    def _paren_value(mm):
         # remove embedded dollar signs from name
         varname = mm.group('varname').replace('$','')
         if defvar(varname):
-            varname = envget(varname)
+            return envget(varname)
         elif noerror:
-            varname = ""
+            return ""
         else:
             raise ValueError("Undefined variable `%s' in string `%s'" %
                              (varname, instring))
 
-        instring = instring[:mm.start()] + varname + instring[mm.end():]
-        mm = __re_var_paren.search(instring)
+    # first expand names in parentheses
+    # note this works on nested names too, expanding from the
+    # inside out (just like IRAF)
+    nsub = 1
+    while nsub:
+        instring, nsub = __re_var_paren.subn(_paren_value, instring)
     # now expand variable name at start of string
     mm = __re_var_match.match(instring)
     if mm is None:
         return instring
-    varname = mm.group('varname')
-    if varname in ['', ' ', None]:
-        mm = __re_var_match2.match(instring)
+    varname = mm.group('name')
+    if varname is None:
         varname = mm.group('varname')
 
     if defvar(varname):
@@ -3,6 +3,7 @@
 Now this module just provides a wrapper around astropy.io.fits.diff for backwards
 compatibility with the old interface in case anyone uses it.
 """
+import functools
 import os
 import sys
 
@@ -14,14 +15,9 @@ def fitsdiff(input1, input2, comment_excl_list='', value_excl_list='',
              field_excl_list='', maxdiff=10, delta=0.0, neglect_blanks=True,
              output=None):
 
-    if isinstance(comment_excl_list, str):
-        comment_excl_list = list_parse(comment_excl_list)
-
-    if isinstance(value_excl_list, str):
-        value_excl_list = list_parse(value_excl_list)
-
-    if isinstance(field_excl_list, str):
-        field_excl_list = list_parse(field_excl_list)
+    comment_excl_list = _parse_excl_list(comment_excl_list)
+    value_excl_list = _parse_excl_list(value_excl_list)
+    field_excl_list = _parse_excl_list(field_excl_list)
 
     diff = FITSDiff(input1, input2, ignore_keywords=value_excl_list,
                     ignore_comments=comment_excl_list,
@@ -47,7 +43,8 @@ def list_parse(name_list):
             log.warning('The file %s does not exist' % value)
             return
         try:
-            return [v.strip() for v in open(value, 'r').readlines()]
+            with open(value, 'r') as fh:
+                return [v.strip() for v in fh]
         except IOError as e:
             log.warning('reading %s failed: %s; ignoring this file' %
                         (value, e))
@@ -55,5 +52,25 @@ def list_parse(name_list):
         return [v.strip() for v in name_list.split(',')]
 
 
+def _parse_excl_list(name_list):
+    """Parse an exclusion list given as a string with `list_parse`, reusing
+    the result of earlier calls for the same comma-separated list.  Lists
+    read from an @file are read again on every call.
+    """
+
+    if not isinstance(name_list, str):
+        return name_list
+
+    if name_list[:1] == '@':
+        return list_parse(name_list)
+
+    return _cached_list_parse(name_list)
+
+
+@functools.lru_cache(maxsize=128)
+def _cached_list_parse(name_list):
+    return tuple(list_parse(name_list))
+
+
 if __name__ == "__main__":
     sys.exit(main())
@@ -22,31 +22,49 @@ __version__ = '2.0'          # Release version number only
 __vdate__ = '2018-04-20'     # Date of this version
 
 
-def _gauss_funct(p, fjac=None, x=None, y=None, err=None,
-                 weights=None):
+def _gauss_funct(p, fjac=None, x=None, y=None, scale=None):
 
     """
     Defines the gaussian function to be used as the model.
 
+    The residuals are multiplied by ``scale`` (the weights, or the inverse
+    errors) when given.  When ``fjac`` is not None, also returns the
+    analytic partial derivatives of the (scaled) model with respect to
+    each parameter.
+
     """
+    # This gets called on every iteration of the fit, so work in place on
+    # a single temporary array as far as possible.
     if p[2] != 0.0:
-        Z = (x - p[1]) / p[2]
-        model = p[0] * np.e ** (-Z ** 2 / 2.0)
+        z = (x - p[1]) / p[2]
+        model = np.square(z)
+        model *= -0.5
+        np.exp(model, out=model)
+        model *= p[0]
     else:
+        z = None
         model = np.zeros(np.size(x))
 
-    status = 0
-    if weights is not None:
-        if err is not None:
-            print("Warning: Ignoring errors and using weights.\n")
+    pderiv = None
+    if fjac is not None:
+        # With model = p0*g and g = exp(-z**2/2), the derivatives are
+        # g, model*z/p2 and model*z**2/p2.
+        pderiv = np.zeros((np.size(x), 3))
+        if z is not None:
+            pderiv[:, 0] = np.exp(-0.5 * z * z)
+            pderiv[:, 1] = model * z / p[2]
+            pderiv[:, 2] = pderiv[:, 1] * z
+        if scale is not None:
+            pderiv *= scale[:, np.newaxis]
 
-        return [status, (y - model) * weights]
+    status = 0
+    resid = np.subtract(y, model, out=model)
+    if scale is not None:
+        resid *= scale
 
-    elif err is not None:
-        return [status, (y - model) / err]
-
-    else:
-        return [status, y - model]
+    if fjac is None:
+        return [status, resid]
+    return [status, resid, pderiv]
 
 
 def gfit1d(y, x=None, err=None, weights=None, par=None, parinfo=None,
@@ -89,25 +107,37 @@ def gfit1d(y, x=None, err=None, weights=None, par=None, parinfo=None,
     [10.         15.          1.41421356]
 
     """
-    y = y.astype(float)
+    # Only make copies of inputs which are not double precision already
+    y = np.asarray(y, dtype=np.float64)
     if weights is not None:
-        weights = weights.astype(float)
+        weights = np.asarray(weights, dtype=np.float64)
     if err is not None:
-        err = err.astype(float)
+        err = np.asarray(err, dtype=np.float64)
     if x is None and len(y.shape) == 1:
-        x = np.arange(len(y)).astype(float)
+        x = np.arange(len(y), dtype=np.float64)
     if x.shape != y.shape:
         print("input arrays X and Y must be of equal shape.\n")
         return
 
-    fa = {'x': x, 'y': y, 'err': err, 'weights': weights}
+    # Decide once how the residuals are scaled, rather than on every
+    # call to _gauss_funct.
+    if weights is not None:
+        if err is not None:
+            print("Warning: Ignoring errors and using weights.\n")
+        scale = weights
+    elif err is not None:
+        scale = 1.0 / err
+    else:
+        scale = None
+
+    fa = {'x': x, 'y': y, 'scale': scale}
 
     if par is not None:
         p = par
     else:
         ysigma = y.std()
-        ind = np.nonzero(y > ysigma)[0]
-        if len(ind) != 0:
+        ind = np.flatnonzero(y > ysigma)
+        if ind.size != 0:
             xind = int(ind.mean())
             p2 = x[xind]
             p1 = y[xind]
@@ -119,26 +149,25 @@ def gfit1d(y, x=None, err=None, weights=None, par=None, parinfo=None,
             if (ymax - ymean) > (abs(ymin - ymean)):
                 p1 = ymax
             else: p1 = ymin
-            ind = (np.nonzero(y == p1))[0]
             p2 = x.mean()
             p3 = 1.
 
 
         p = [p1, p2, p3]
     m = nmpfit.mpfit(_gauss_funct, p,parinfo = parinfo, functkw=fa,
-    maxiter=maxiter, quiet=quiet)
+    maxiter=maxiter, quiet=quiet, autoderivative=0)
     if (m.status <= 0): print('error message = ', m.errmsg)
     return m
 
 
 def plot_fit(y, mfit, x=None):
     if x is None:
-        x = N.arange(len(y))
+        x = np.arange(len(y))
     else:
         x = x
     p = mfit.params
     #y = gauss_funct(p, y)
-    yy = p[0] + N.e**(-0.5*(x-p[1])**2/p[2]**2)
+    yy = p[0] * np.exp(-0.5 * ((x - p[1]) / p[2])**2)
     try:
         import pylab
     except ImportError:
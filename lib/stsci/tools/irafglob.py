@@ -1,4 +1,5 @@
 import glob
+import os
 
 try:
     from .fileutil import osfn  # added to provide interpretation of environment variables
@@ -8,6 +9,8 @@ except Exception:
 __author__ = 'Paul Barrett'
 __version__ = '1.1'
 
+_magic_chars = frozenset('*?[')
+
 
 def irafglob(inlist, atfile=None):
     """ Returns a list of filenames based on the type of IRAF input.
@@ -15,39 +18,47 @@ def irafglob(inlist, atfile=None):
     Handles lists, wild-card characters, and at-files.  For special
     at-files, use the atfile keyword to process them.
 
-    This function is recursive, so IRAF lists can also contain at-files
+    IRAF lists can also contain nested lists, at-files
     and wild-card characters, e.g. `a.fits`, `@file.lst`, `*flt.fits`.
     """
 
-    # Sanity check
-    if inlist is None or len(inlist) == 0:
-        return []
-
-    # Determine which form of input was provided:
-    if isinstance(inlist, list):
-        #  python list
-        flist = []
-        for f in inlist:
-            flist += irafglob(f)
-    elif ',' in inlist:
-        #  comma-separated string list
-        flist = []
-        for f in inlist.split(','):
-            f = f.strip()
-            flist += irafglob(f)
-    elif inlist[0] == '@':
-        #  file list
-        flist = []
-        for f in open(inlist[1:], 'r').readlines():
-            f = f.rstrip()
+    # Walk the (possibly nested) input with an explicit stack instead of
+    # recursing once per element.  Each entry carries the atfile hook
+    # to apply to its at-file lines, which is only ever the top-level one.
+    flist = []
+    stack = [(inlist, atfile)]
+    while stack:
+        item, hook = stack.pop()
+
+        # Sanity check
+        if item is None or len(item) == 0:
+            continue
+
+        # Determine which form of input was provided:
+        if isinstance(item, list):
+            #  python list
+            stack.extend((f, None) for f in reversed(item))
+        elif ',' in item:
+            #  comma-separated string list
+            stack.extend((f.strip(), None) for f in reversed(item.split(',')))
+        elif item[0] == '@':
+            #  file list
+            with open(item[1:], 'r') as fh:
+                lines = [f.rstrip() for f in fh.read().splitlines()]
             # hook for application specific atfiles.
-            if atfile:
-                f = atfile(f)
-            flist += irafglob(f)
-    else:
-        #  shell globbing
-        if osfn:
-            inlist = osfn(inlist)
-        flist = glob.glob(inlist)
+            if hook:
+                lines = [hook(f) for f in lines]
+            stack.extend((f, None) for f in reversed(lines))
+        else:
+            #  shell globbing
+            if osfn:
+                item = osfn(item)
+            if _magic_chars.isdisjoint(item):
+                # A plain filename only needs an existence check, exactly
+                # what glob would do for it, without the pattern machinery.
+                if os.path.lexists(item):
+                    flist.append(item)
+            else:
+                flist.extend(glob.iglob(item))
 
     return flist
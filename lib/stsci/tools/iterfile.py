@@ -8,6 +8,14 @@ class IterFitsFile:
         access the data from a FITS file without leaving
         the file-handle open between reads.
 
+        When used as a context manager, the file is instead
+        opened only once and kept open until the end of the
+        ``with`` block, for reading many rows in a row::
+
+            with IterFitsFile('image.fits[sci,1]') as f:
+                for i in range(f.shape[0]):
+                    row = f[i]
+
     """
     def __init__(self, name):
         self.name = name
@@ -16,6 +24,7 @@ class IterFitsFile:
         self.handle = None
         self.inmemory = False
         self.compress = False
+        self._keepopen = False
 
         if not self.fname:
             self.fname,self.extn = parseFilename(name)
@@ -26,31 +35,47 @@ class IterFitsFile:
             raise TypeError('Input value must be boolean')
         self.inmemory = val
 
+    @property
+    def data(self):
+        """ The data array associated with this file/extension."""
+        return self._data()
+
+    @property
+    def shape(self):
+        """ The shape of the data array associated with this file."""
+        return self._shape()
+
     def _shape(self):
         """ Returns the shape of the data array associated with this file."""
         hdu = self.open()
         _shape = hdu.shape
-        if not self.inmemory:
-            self.close()
-            del hdu
+        self._release()
+        del hdu
         return _shape
 
     def _data(self):
         """ Returns the data array associated with this file/extenstion."""
         hdu = self.open()
         _data = hdu.data.copy()
-        if not self.inmemory:
-            self.close()
-            del hdu
+        self._release()
+        del hdu
         return _data
 
     def type(self):
-        """ Returns the shape of the data array associated with this file."""
+        """ Returns the data type of the data array associated with this file."""
         hdu = self.open()
-        _type = hdu.data.dtype.name
-        if not self.inmemory:
-            self.close()
-            del hdu
+        if self.inmemory:
+            _type = hdu.data.dtype.name
+        else:
+            # The section works the dtype out from the header, so the
+            # (possibly compressed) data array never has to be read.
+            try:
+                _type = hdu.section.dtype.name
+            except AttributeError:
+                # older astropy versions
+                _type = hdu.data.dtype.name
+        self._release()
+        del hdu
         return _type
 
     def open(self):
@@ -77,6 +102,19 @@ class IterFitsFile:
             self.handle.close()
         self.handle = None
 
+    def _release(self):
+        """ Closes the file after a read, unless it should stay open."""
+        if not (self.inmemory or self._keepopen):
+            self.close()
+
+    def __enter__(self):
+        self._keepopen = True
+        return self
+
+    def __exit__(self, *exc_info):
+        self._keepopen = False
+        self.close()
+
     def __getitem__(self,i):
         """ Returns a PyFITS section for the rows specified. """
         # All I/O must be done here, starting with open
@@ -86,22 +124,12 @@ class IterFitsFile:
         else:
             _data = hdu.section[i,:]
 
-        if not self.inmemory:
-            self.close()
-            del hdu
+        self._release()
+        del hdu
 
         return _data
 
 
-    def __getattribute__(self,name):
-        if name == 'data':
-            return self._data()
-        elif name == 'shape':
-            return self._shape()
-        else:
-            return object.__getattribute__(self,name)
-
-
 def parseFilename(filename):
     """
         Parse out filename from any specified extensions.
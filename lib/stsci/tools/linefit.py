@@ -43,27 +43,28 @@ def linefit(x, y, weights=None):
         print("Error: X and Y must have equal size\n")
         return
     n = len(x)
-    w = np.zeros((n,n)).astype(float)
     if weights is None:
-        for i in np.arange(n):
-            w[i,i] = 1
+        w = np.ones(n)
     else:
         if len(weights) != n:
             print("Error: Weights must have the same size as X and Y.\n")
             return
-        for i in np.arange(n):
-            w[i,i] = weights[i]
-    x = x.astype(float)
-    y = y.astype(float)
+        w = np.require(weights, dtype=np.float64, requirements='C')
+    # only copy inputs that are not contiguous double arrays already
+    x = np.require(x, dtype=np.float64, requirements='C')
+    y = np.require(y, dtype=np.float64, requirements='C')
     # take the weighted avg for calculatiing the covarince
-    Xavg = np.sum(np.dot(w,x)) / np.sum(w.diagonal())
-    Yavg = np.sum(np.dot(w,y)) / np.sum(w.diagonal())
+    # (the weights only ever form a diagonal matrix, so apply them
+    # element-wise instead of building and multiplying an n x n matrix)
+    sw = np.sum(w)
+    Xavg = np.dot(w, x) / sw
+    Yavg = np.dot(w, y) / sw
 
     xm = x - Xavg
-    xmt = np.transpose(xm)
     ym = y - Yavg
 
-    b1 = np.dot(xmt,np.dot(w,ym)) / np.dot(xmt ,np.dot(w,xm))
+    wxm = w * xm
+    b1 = np.dot(wxm, ym) / np.dot(wxm, xm)
     b0 = Yavg - b1 * Xavg
 
     return b0, b1
@@ -2,12 +2,15 @@
 A collection of utilities for handling output to standard out/err as well as
 to file-based or other logging handlers through a single interface.
 """
+import atexit
 import builtins
-import inspect
+import copy
+import functools
 import logging
 import os
 import sys
 import threading
+import time
 
 global_logging_started = False
 
@@ -75,6 +78,13 @@ class StreamTeeLogger(logging.Logger):
         self.propagate = False
         self.buffer = ''
 
+        # Lines waiting to be logged; see set_line_buffer()
+        self.line_buffer = 1
+        self.flush_interval = None
+        self._pending = []
+        self._last_flush = time.monotonic()
+        self._atexit_registered = False
+
         self.stream = None
         self.set_stream(stream)
 
@@ -124,6 +134,27 @@ class StreamTeeLogger(logging.Logger):
 
         self.stream = stream
 
+    def set_line_buffer(self, line_buffer, flush_interval=0.1):
+        """
+        Set how many complete lines `write()` may collect before they are
+        published to the logging system.  The collected lines are also
+        published by any `write()` coming more than ``flush_interval``
+        seconds after they were last published, by `flush()`, and at exit.
+        A ``line_buffer`` of 1 (the default) publishes every line as soon as
+        it is written.
+
+        Note that the echo to the stream this logger replaces (e.g. the
+        terminal for `sys.stdout`) is held back along with the log records,
+        so collected lines only appear there once they are published.
+        """
+
+        self._flush_pending()
+        self.line_buffer = line_buffer
+        self.flush_interval = flush_interval
+        if line_buffer > 1 and not self._atexit_registered:
+            atexit.register(self._flush_pending)
+            self._atexit_registered = True
+
     def write(self, message):
         """
         Buffers each message until a newline is reached.  Each complete line is
@@ -137,11 +168,46 @@ class StreamTeeLogger(logging.Logger):
                 return
 
             # For each line in the buffer ending with \n, output that line to
-            # the logger
-            msgs = (self.buffer + message).split('\n')
-            self.buffer = msgs.pop(-1)
-            for m in msgs:
-                self.log_orig(m, echo=True)
+            # the logger; a write without any newline is only buffered
+            buf = self.buffer + message
+            idx = buf.rfind('\n')
+            if idx < 0:
+                self.buffer = buf
+                return
+            self.buffer = buf[idx + 1:]
+            # All lines of one write() come from the same caller
+            caller = self.find_actual_caller()
+            if self.line_buffer <= 1:
+                for m in buf[:idx].split('\n'):
+                    self.log_orig(m, echo=True, caller=caller)
+                return
+
+            self._pending.extend((m, caller) for m in buf[:idx].split('\n'))
+            if (len(self._pending) >= self.line_buffer or
+                    (self.flush_interval is not None and
+                     time.monotonic() - self._last_flush >=
+                     self.flush_interval)):
+                self._publish_pending()
+        finally:
+            self.__thread_local_ctx.write_count -= 1
+
+    def _publish_pending(self):
+        pending, self._pending = self._pending, []
+        self._last_flush = time.monotonic()
+        for m, caller in pending:
+            self.log_orig(m, echo=True, caller=caller)
+
+    def _flush_pending(self):
+        """Publishes any lines collected by `write()`."""
+
+        if not self._pending:
+            return
+
+        self.__thread_local_ctx.write_count += 1
+        try:
+            if self.__thread_local_ctx.write_count > 1:
+                return
+            self._publish_pending()
         finally:
             self.__thread_local_ctx.write_count -= 1
 
@@ -151,6 +217,7 @@ class StreamTeeLogger(logging.Logger):
         any attached stream-like object (e.g. `sys.stdout`).
         """
 
+        self._flush_pending()
         for handler in self.handlers:
             handler.flush()
 
@@ -166,8 +233,10 @@ class StreamTeeLogger(logging.Logger):
                           self.stream)
         return fd
 
-    def log_orig(self, message, echo=True):
-        modname, path, lno, func = self.find_actual_caller()
+    def log_orig(self, message, echo=True, caller=None):
+        if caller is None:
+            caller = self.find_actual_caller()
+        modname, path, lno, func = caller
         self.log(self.level, message,
                  extra={'orig_name': modname, 'orig_pathname': path,
                         'orig_lineno': lno, 'orig_func': func, 'echo': echo})
@@ -193,20 +262,17 @@ class StreamTeeLogger(logging.Logger):
         rv = "(unknown module)", "(unknown file)", 0, "(unknown function)"
         while hasattr(f, "f_code"):
             co = f.f_code
-            filename = os.path.normcase(co.co_filename)
-            mod = inspect.getmodule(f)
-
-            if mod is None:
-                modname = '__main__'
-            else:
-                modname = mod.__name__
+            # Like logging.Logger.findCaller, take the module name from the
+            # frame globals rather than searching sys.modules for it
+            modname = f.f_globals.get('__name__', '__main__')
 
             if modname == __name__:
                 # Crawl back until the first frame outside of this module
                 f = f.f_back
                 continue
 
-            rv = (modname, filename, f.f_lineno, co.co_name)
+            rv = (modname, os.path.normcase(co.co_filename), f.f_lineno,
+                  co.co_name)
             break
         return rv
 
@@ -335,6 +401,8 @@ def teardown_global_logging():
 
     stdout_logger = logging.getLogger(__name__ + '.stdout')
     stderr_logger = logging.getLogger(__name__ + '.stderr')
+    stdout_logger.flush()
+    stderr_logger.flush()
     if sys.stdout is stdout_logger:
         sys.stdout = sys.stdout.stream
     if sys.stderr is stderr_logger:
@@ -364,7 +432,7 @@ def teardown_global_logging():
 # http://www.astropython.org/snippet/2010/2/Easier-python-logging
 def create_logger(name, format='%(levelname)s: %(message)s', datefmt=None,
                   stream=None, level=logging.INFO, filename=None, filemode='w',
-                  filelevel=None, propagate=True):
+                  filelevel=None, propagate=True, buffered=False):
     """
     Do basic configuration for the logging system. Similar to
     logging.basicConfig but the logger ``name`` is configurable and both a file
@@ -387,6 +455,10 @@ def create_logger(name, format='%(levelname)s: %(message)s', datefmt=None,
     :param filemode: open ``filename`` with specified filemode ('w' or 'a')
     :param filelevel: logger level for file logger (default=``level``)
     :param propagate: propagate message to parent (default=True)
+    :param buffered: let the file handler flush only when its buffer fills
+                     up rather than after every record, at the risk of
+                     losing the last records if the process dies
+                     (default=False)
 
     :returns: logging.Logger object
     """
@@ -407,7 +479,10 @@ def create_logger(name, format='%(levelname)s: %(message)s', datefmt=None,
         logger.addHandler(logging.NullHandler())
 
     if filename:
-        hdlr = logging.FileHandler(filename, filemode)
+        if buffered:
+            hdlr = _BufferedFileHandler(filename, filemode)
+        else:
+            hdlr = logging.FileHandler(filename, filemode)
         if filelevel is None:
             filelevel = level
         hdlr.setLevel(filelevel)
@@ -423,6 +498,35 @@ def create_logger(name, format='%(levelname)s: %(message)s', datefmt=None,
     return logger
 
 
+class _BufferedFileHandler(logging.FileHandler):
+    """
+    `logging.FileHandler` which does not flush the file after every record,
+    leaving that to the file's own buffer.  Explicit `flush()` calls, and
+    closing the handler (e.g. by `logging.shutdown` at exit), still write
+    everything out.
+    """
+
+    def __init__(self, filename, mode='a', encoding=None, delay=False):
+        self._emitting = False
+        logging.FileHandler.__init__(self, filename, mode, encoding, delay)
+
+    def emit(self, record):
+        # Called with the handler lock held, see logging.Handler.handle()
+        self._emitting = True
+        try:
+            logging.FileHandler.emit(self, record)
+        finally:
+            self._emitting = False
+
+    def flush(self):
+        self.acquire()
+        try:
+            if not self._emitting:
+                logging.FileHandler.flush(self)
+        finally:
+            self.release()
+
+
 class _StreamHandlerEchoFilter(logging.Filter):
     """
     Filter used by the `logging.StreamHandler` internal to `StreamTeeLogger`;
@@ -438,6 +542,17 @@ class _StreamHandlerEchoFilter(logging.Filter):
         return False
 
 
+@functools.lru_cache(maxsize=256)
+def _split_pathname(pathname):
+    """
+    Returns the ``filename`` and ``module`` `logging.LogRecord` attributes
+    for ``pathname``; these repeat for every line printed from a module.
+    """
+
+    filename = os.path.basename(pathname)
+    return filename, os.path.splitext(filename)[0]
+
+
 class _LogTeeHandler(logging.Handler):
     def __init__(self, level=logging.NOTSET):
         logging.Handler.__init__(self, level)
@@ -450,12 +565,22 @@ class _LogTeeHandler(logging.Handler):
         if not hasattr(record, 'orig_name'):
             return
 
-        record = logging.LogRecord(record.orig_name, record.levelno,
-                                   record.orig_pathname, record.orig_lineno,
-                                   record.msg, record.args, record.exc_info,
-                                   record.orig_func)
+        logger = logging.getLogger(record.orig_name)
+        if logger.disabled:
+            # logger.handle() would drop the record anyway, so don't
+            # bother building it
+            return
+
+        # Re-address a copy of the record to its place of origin; the rest
+        # (time, thread, process, ...) was already filled in when the record
+        # was first created
+        record = copy.copy(record)
+        record.name = record.orig_name
+        record.pathname = record.orig_pathname
+        record.filename, record.module = _split_pathname(record.pathname)
+        record.lineno = record.orig_lineno
+        record.funcName = record.orig_func
         record.origin = ""
-        logger = logging.getLogger(record.name)
         if not logger.handlers:
             logger.addHandler(logging.NullHandler())
 
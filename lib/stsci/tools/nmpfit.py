@@ -1528,22 +1528,22 @@ e.g. mpfit.status, mpfit.errmsg, mpfit.params, npfit.niter, mpfit.covar.
             mperr = 0
             fjac = np.zeros(nall, float)
             np.put(fjac, ifree, 1.0)  ## Specify which parameters need derivatives
-            [status, fp] = self.call(fcn, xall, functkw, fjac=fjac)
+            [status, fp, fjac] = self.call(fcn, xall, functkw, fjac=fjac)
+            if (status < 0): return(None)
 
-            if len(fjac) != m*nall:
+            fjac = np.asarray(fjac, dtype=float)
+            if fjac.size != m*nall:
                 print('ERROR: Derivative matrix was not computed properly.')
                 return(None)
 
             ## This definition is c1onsistent with CURVEFIT
             ## Sign error found (thanks Jesus Fernandez <fernande@irm.chu-caen.fr>)
-            fjac.shape = [m,nall]
-            fjac = -fjac
+            fjac = -fjac.reshape(m, nall)
 
             ## Select only the free parameters
             if len(ifree) < nall:
                 fjac = fjac[:,ifree]
-                fjac.shape = [m, n]
-                return(fjac)
+            return(fjac)
 
         fjac = np.zeros([m, n], float)
 
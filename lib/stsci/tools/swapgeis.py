@@ -223,18 +223,19 @@ def byteswap(input,output=None,clobber=True):
     errormsg = ""
 
     loc = 0
-    outdat = b''
+    # Collect the swapped groups and join them once at the end, rather
+    # than re-copying the whole output for every group
+    outdat = []
     for k in range(gcount):
-        ext_dat = numpy.fromstring(dat[loc:loc+data_size], dtype=_code)
+        ext_dat = numpy.frombuffer(dat[loc:loc+data_size], dtype=_code)
         ext_dat = ext_dat.reshape(_shape).byteswap()
-        outdat += ext_dat.tostring()
+        outdat.append(ext_dat.tobytes())
 
-        ext_hdu = fits.hdu.ImageHDU(data=ext_dat)
-
-        rec = numpy.fromstring(dat[loc+data_size:loc+group_size], dtype=formats).byteswap()
-        outdat += rec.tostring()
+        rec = numpy.frombuffer(dat[loc+data_size:loc+group_size], dtype=formats).byteswap()
+        outdat.append(rec.tobytes())
 
         loc += group_size
+    outdat = b''.join(outdat)
 
     if os.path.exists(output):
         os.remove(output)
@@ -408,7 +409,7 @@ def byteswap(input,output=None,clobber=True):
 
     loc = 0
     for k in range(gcount):
-        ext_dat = numpy.fromstring(dat[loc:loc+data_size], dtype=_code)
+        ext_dat = numpy.frombuffer(dat[loc:loc+data_size], dtype=_code).copy()
         ext_dat = ext_dat.reshape(_shape)
         if _uint16:
             ext_dat += _bzero
@@ -439,7 +440,7 @@ def byteswap(input,output=None,clobber=True):
 
         arr_stack[k] = ext_dat
 
-        rec = numpy.fromstring(dat[loc+data_size:loc+group_size], dtype=formats)
+        rec = numpy.frombuffer(dat[loc+data_size:loc+group_size], dtype=formats)
 
         loc += group_size
 
@@ -0,0 +1,72 @@
+import os
+
+import pytest
+from astropy.io import fits
+
+from stsci.tools import convertlog
+
+
+@pytest.fixture(params=['fitsio', 'astropy'])
+def writer(request, monkeypatch):
+    """Run a test with each of the FITS writers used by `convertlog.convert`."""
+    if request.param == 'fitsio':
+        if convertlog.fitsio is None:
+            pytest.skip('fitsio is not available')
+    else:
+        monkeypatch.setattr(convertlog, 'fitsio', None)
+    return request.param
+
+
+def test_wrap_text():
+    assert list(convertlog.wrap_text('short line\n', 20)) == ['short line']
+    assert list(convertlog.wrap_text('   \n', 20)) == []
+    assert list(convertlog.wrap_text('aaa bbb ccc ddd', 8)) == ['aaa bbb', 'ccc ddd']
+    assert list(convertlog.wrap_text('abcdefghij', 4)) == ['abcd', 'efgh', 'ij']
+    assert list(convertlog.wrap_text('one two\n\n  three\tfour  \n', 7)) == [
+        'one two', '  three', 'four']
+    # Unlike textwrap.wrap, a long word is moved to a new chunk before
+    # it is split, and hyphens are not used as break points
+    assert list(convertlog.wrap_text('ab verylongword', 5)) == [
+        'ab', 'veryl', 'ongwo', 'rd']
+    assert list(convertlog.wrap_text('self-contained value here', 10)) == [
+        'self-conta', 'ined value', 'here']
+    # Indentation is dropped rather than splitting a word that fits alone
+    assert list(convertlog.wrap_text('  abcdefghijklmnopqrs\n', 20)) == [
+        'abcdefghijklmnopqrs']
+    assert list(convertlog.wrap_text('  abcdefghijklmnopqrstuv\n', 20)) == [
+        'abcdefghijklmnopqrst', 'uv']
+
+
+def test_convert(tmpdir, writer):
+    trl_name = str(tmpdir.join('test1.tra'))
+    with open(trl_name, 'w') as trl:
+        trl.write('first line\n')
+        trl.write('\n')
+        trl.write('x' * 30 + ' end\n')
+
+    convertlog.convert(trl_name, width=20)
+
+    fits_name = str(tmpdir.join('test1_trl.fits'))
+    assert not os.path.exists(trl_name)
+    with fits.open(fits_name) as hdul:
+        assert hdul[1].columns['TEXT_FILE'].format == '20A'
+        assert list(hdul[1].data['TEXT_FILE']) == [
+            'first line', 'x' * 20, 'x' * 10 + ' end']
+
+
+def test_convert_overwrite(tmpdir, writer):
+    trl_name = str(tmpdir.join('test2.tra'))
+    fits_name = str(tmpdir.join('test2_trl.fits'))
+    for text in ('old trailer', 'new trailer'):
+        with open(trl_name, 'w') as trl:
+            trl.write(text + '\n')
+        convertlog.convert(trl_name, output=fits_name)
+
+    assert os.listdir(str(tmpdir)) == ['test2_trl.fits']
+    with fits.open(fits_name) as hdul:
+        assert list(hdul[1].data['TEXT_FILE']) == ['new trailer']
+
+    with open(trl_name, 'w') as trl:
+        trl.write('kept trailer\n')
+    with pytest.raises(IOError):
+        convertlog.convert(trl_name, output=fits_name, keep=True)
@@ -0,0 +1,25 @@
+import os
+
+from astropy.io import fits
+
+from stsci.tools import convertwaiveredfits
+
+data_dir = os.path.join(os.path.dirname(__file__), 'data')
+
+
+def test_extension_cards_replace_table_columns():
+    with fits.open(os.path.join(data_dir, 'waivered.fits')) as whdul:
+        # Add a ROOTNAME column to the group parameter table
+        columns = whdul[1].columns + fits.Column(
+            name='ROOTNAME', format='A9', array=['ub9o0101m'])
+        whdul[1] = fits.TableHDU.from_columns(columns,
+                                              header=whdul[1].header)
+
+        mhdul = convertwaiveredfits.toMultiExtensionFits(whdul)
+
+    hdr = mhdul[1].header
+    for keyword in ['EXTNAME', 'EXPNAME', 'EXTVER', 'INHERIT', 'ROOTNAME']:
+        assert hdr.count(keyword) == 1
+    assert list(hdr)[-5:] == ['EXTNAME', 'EXPNAME', 'EXTVER', 'INHERIT',
+                              'ROOTNAME']
+    assert hdr['EXTVER'] == 1
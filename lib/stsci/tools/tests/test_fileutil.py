@@ -0,0 +1,160 @@
+import os
+import shutil
+
+import numpy as np
+import pytest
+from astropy.io import fits
+
+from stsci.tools import fileutil as fu
+
+data_dir = os.path.join(os.path.dirname(__file__), 'data')
+
+
+def test_getHeader_appends_extension():
+    filename = os.path.join(data_dir, 'o4sp040b0_raw.fits')
+    with fits.open(filename) as f:
+        expected = f[0].header.copy()
+        del expected['NAXIS']
+        for card in f['sci', 2].header.cards:
+            expected.append(card)
+
+    hdr = fu.getHeader(filename + '[sci,2]')
+    assert hdr.tostring() == expected.tostring()
+
+
+def test_findFile_extensions():
+    filename = os.path.join(data_dir, 'o4sp040b0_raw.fits')
+
+    assert fu.findFile(filename)
+    assert fu.findFile(filename + '[sci,2]')
+    assert fu.findFile(filename + '[3]')
+    assert not fu.findFile(filename + '[sci,9]')
+    assert not fu.findFile(filename + '[30]')
+    assert not fu.findFile(os.path.join(data_dir, 'missing.fits'))
+
+
+def test_removeFile_wildcards(tmpdir):
+    for name in ['a1.fits', 'a22.fits', 'a1.fits.bak', 'b.c0h', 'b.c0d']:
+        tmpdir.join(name).write('')
+
+    with tmpdir.as_cwd():
+        fu.removeFile(['a?.fits', '*.c0h'])
+
+    assert sorted(p.basename for p in tmpdir.listdir()) == ['a1.fits.bak',
+                                                            'a22.fits']
+
+
+def test_removeFile_geis_pairs(tmpdir):
+    for name in ['a.c0h', 'a.c0d', 'b.txt', 'b.txd', 'c.fits.bak', 'c.fits.bad']:
+        tmpdir.join(name).write('')
+
+    with tmpdir.as_cwd():
+        fu.removeFile(['a.c0h', 'b.txt', 'c.fits.bak'])
+
+    assert sorted(p.basename for p in tmpdir.listdir()) == ['b.txd',
+                                                            'c.fits.bad']
+
+
+def test_getKeyword_after_updateKeyword(tmpdir):
+    filename = str(tmpdir.join('test.fits'))
+    shutil.copy(os.path.join(data_dir, 'o4sp040b0_raw.fits'), filename)
+    assert fu.getKeyword(filename + '[sci,1]', 'TARGNAME') == 'HD101998'
+
+    # An in-place edit keeps the file size, and on file systems with coarse
+    # time stamps it may not even change the modification time
+    stat = os.stat(filename)
+    fu.updateKeyword(filename + '[sci,1]', 'TARGNAME', 'NEWTARG')
+    os.utime(filename, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert os.path.getsize(filename) == stat.st_size
+
+    assert fu.getKeyword(filename + '[sci,1]', 'TARGNAME') == 'NEWTARG'
+    # keywords missing from the extension come from the primary header
+    assert fu.getKeyword(filename + '[sci,1]', 'ROOTNAME') == 'o4sp040b0'
+
+
+def test_buildRootname_sees_new_files(tmpdir):
+    dirname = str(tmpdir)
+    with tmpdir.as_cwd():
+        assert fu.buildRootname('new.fits') is None
+
+        # A file created without changing the directory's time stamp, as
+        # can happen on file systems with coarse time stamps
+        stat = os.stat(dirname)
+        tmpdir.join('new.fits').write('')
+        tmpdir.mkdir('dir.fits')
+        os.utime(dirname, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+        assert fu.buildRootname('new.fits') == 'new.fits'
+        # directories are not files
+        assert fu.buildRootname('dir.fits') is None
+
+
+def _open_files(filename):
+    """
+    Return the file descriptors and memory maps of this process that are
+    open on ``filename``.
+    """
+    fds = []
+    for fd in os.listdir('/proc/self/fd'):
+        try:
+            if os.readlink(os.path.join('/proc/self/fd', fd)) == filename:
+                fds.append(fd)
+        except OSError:
+            pass
+    with open('/proc/self/maps') as maps:
+        fds.extend(line for line in maps if line.rstrip().endswith(filename))
+    return fds
+
+
+@pytest.mark.skipif(not os.path.isdir('/proc/self/fd'),
+                    reason='needs /proc/self/fd')
+def test_handles_closed(tmpdir):
+    filename = str(tmpdir.join('test.fits'))
+    shutil.copy(os.path.join(data_dir, 'o4sp040b0_raw.fits'), filename)
+
+    fu.getHeader(filename + '[sci,1]')
+    assert _open_files(filename) == []
+
+    # memory-mapped data is released as well
+    filename = str(tmpdir.join('mmap.fits'))
+    fits.PrimaryHDU(np.ones((10, 10), dtype=np.float32)).writeto(filename)
+    fimg = fu.openImage(filename, memmap=True)
+    assert fimg[0].data.sum() == 100
+    assert _open_files(filename) != []
+    fu.close_fully(fimg)
+    assert _open_files(filename) == []
+
+
+@pytest.mark.parametrize('strict', [False, True])
+def test_verifyWriteMode(tmpdir, strict):
+    existing = tmpdir.join('existing.fits')
+    existing.write('')
+    missing = tmpdir.join('missing.fits')
+
+    assert fu.verifyWriteMode(str(existing), strict=strict)
+    # a missing file counts as writable if it can be created...
+    assert fu.verifyWriteMode([str(existing), str(missing)], strict=strict)
+    # and the strict check creates it by opening it
+    assert missing.check() == strict
+
+    # ... but not if its directory does not exist
+    assert not fu.verifyWriteMode(str(tmpdir.join('nodir', 'new.fits')),
+                                  strict=strict)
+    assert not fu.verifyWriteMode(str(tmpdir), strict=strict)
+
+
+@pytest.mark.skipif(not hasattr(os, 'geteuid') or os.geteuid() == 0,
+                    reason='file permissions do not apply to root')
+@pytest.mark.parametrize('strict', [False, True])
+def test_verifyWriteMode_readonly(tmpdir, strict, capsys):
+    readonly = tmpdir.join('readonly.fits')
+    readonly.write('')
+    readonly.chmod(0o444)
+    writable = tmpdir.join('writable.fits')
+    writable.write('')
+
+    assert not fu.verifyWriteMode([str(writable), str(readonly)],
+                                  strict=strict)
+    out = capsys.readouterr().out
+    assert str(readonly) in out
+    assert str(writable) not in out
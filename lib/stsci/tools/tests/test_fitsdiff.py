@@ -0,0 +1,26 @@
+import os
+
+from stsci.tools import fitsdiff
+
+
+def test_parse_excl_list():
+    assert fitsdiff._parse_excl_list('A, B ,C') == ('A', 'B', 'C')
+    assert fitsdiff._parse_excl_list(['A']) == ['A']
+
+
+def test_parse_excl_list_rereads_files(tmpdir):
+    excl_file = tmpdir.join('excl.lst')
+    name_list = '@' + str(excl_file)
+
+    # A missing file is reported, and ignored, on every call
+    assert fitsdiff._parse_excl_list(name_list) is None
+
+    excl_file.write('DATE\nORIGIN\n')
+    assert fitsdiff._parse_excl_list(name_list) == ['DATE', 'ORIGIN']
+
+    # Edit the file without changing its time stamp, as can happen on file
+    # systems with coarse time stamps
+    stat = os.stat(str(excl_file))
+    excl_file.write('FILENAME\n')
+    os.utime(str(excl_file), ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert fitsdiff._parse_excl_list(name_list) == ['FILENAME']
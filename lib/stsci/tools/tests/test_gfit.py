@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from stsci.tools import gfit, nmpfit
+
+
+def _numeric_funct(p, fjac=None, **kwargs):
+    # _gauss_funct without its derivatives, for finite differencing
+    return gfit._gauss_funct(p, **kwargs)[:2]
+
+
+@pytest.mark.parametrize('parinfo', [
+    None,
+    [{'fixed': 0}, {'fixed': 1}, {'fixed': 0}],
+])
+def test_gfit1d_analytic_matches_numeric(parinfo):
+    rng = np.random.default_rng(42)
+    x = np.linspace(0, 30, 500)
+    err = np.full(x.shape, 0.1)
+    y = 5.0 * np.exp(-0.5 * ((x - 14.0) / 2.0)**2) + rng.normal(0, 0.1,
+                                                                x.shape)
+    par = [4.0, 14.0, 1.5]
+
+    analytic = gfit.gfit1d(y, x=x, err=err, par=par, parinfo=parinfo,
+                           quiet=1)
+    numeric = nmpfit.mpfit(_numeric_funct, par, parinfo=parinfo, quiet=1,
+                           functkw={'x': x, 'y': y, 'scale': 1.0 / err})
+
+    assert analytic.status > 0
+    assert numeric.status > 0
+    np.testing.assert_allclose(analytic.params, numeric.params, rtol=1e-6)
+    np.testing.assert_allclose(analytic.perror, numeric.perror, rtol=1e-4)
+    np.testing.assert_allclose(analytic.params, [5.0, 14.0, 2.0], rtol=0.05)
+    if parinfo is not None:
+        assert analytic.params[1] == 14.0
+        assert analytic.perror[1] == 0
+    # the analytic derivatives save the finite-difference evaluations
+    assert analytic.nfev < numeric.nfev
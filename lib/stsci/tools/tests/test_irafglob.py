@@ -0,0 +1,57 @@
+import pytest
+
+from stsci.tools.irafglob import irafglob
+
+
+@pytest.fixture
+def listdir(tmpdir):
+    for name in ['a1.fits', 'a2.fits', 'b.fits', 'c.txt']:
+        tmpdir.join(name).write('')
+    tmpdir.join('inner.lst').write('b.fits\n  \nmissing.fits\n')
+    tmpdir.join('outer.lst').write('a*.fits\n@inner.lst  \nc.txt, b.fits\n')
+    with tmpdir.as_cwd():
+        yield tmpdir
+
+
+def test_empty(listdir):
+    assert irafglob('') == []
+    assert irafglob(None) == []
+    assert irafglob([]) == []
+
+
+def test_literals_and_wildcards(listdir):
+    # names that do not exist are dropped, just as glob would
+    assert irafglob('b.fits') == ['b.fits']
+    assert irafglob('missing.fits') == []
+    assert irafglob('missing*.fits') == []
+
+    flist = irafglob(' c.txt , a?.fits,missing.fits ,b.fits')
+    assert flist[0] == 'c.txt'
+    assert sorted(flist[1:3]) == ['a1.fits', 'a2.fits']
+    assert flist[3:] == ['b.fits']
+
+
+def test_nested_lists_and_atfiles(listdir):
+    flist = irafglob(['@outer.lst', ['c.txt', '', None], 'b.fits'])
+    assert sorted(flist[:2]) == ['a1.fits', 'a2.fits']
+    assert flist[2:] == ['b.fits', 'c.txt', 'b.fits', 'c.txt', 'b.fits']
+
+
+def test_atfile_hook(listdir):
+    calls = []
+
+    def atfile(line):
+        calls.append(line)
+        return line.split()[0] if line.strip() else line
+
+    listdir.join('hook.lst').write('b.fits extra\nc.txt 2\n@inner.lst\n')
+    assert irafglob('@hook.lst', atfile=atfile) == ['b.fits', 'c.txt',
+                                                    'b.fits']
+    # only the lines of the at-file given at the top level go through the
+    # hook, not those of nested at-files
+    assert calls == ['b.fits extra', 'c.txt 2', '@inner.lst']
+
+    # at-files inside a list do not use the hook either
+    calls.clear()
+    assert irafglob(['@inner.lst'], atfile=atfile) == ['b.fits']
+    assert calls == []
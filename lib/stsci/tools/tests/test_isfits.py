@@ -1,7 +1,9 @@
 import os
 import tempfile
 
+import numpy as np
 import pytest
+from astropy.io import fits
 
 from stsci.tools import fileutil as F
 from stsci.tools import stpyfits
@@ -34,3 +36,20 @@ class TestIsFits(FitsTestCase):
             assert F.isFits(f) == (True, 'mef')
         with stpyfits.open(self.data('waivered.fits')) as f:
             assert F.isFits(f) == (True, 'waiver')
+
+    def test_isFits_header_sniff(self):
+        # Classifying a file by name reads its headers directly; make sure
+        # it agrees with classifying the opened HDUList.
+        table = fits.TableHDU.from_columns(
+            [fits.Column(name='A', format='I5', array=np.arange(2))])
+        hduls = {
+            'simple.fits': [fits.PrimaryHDU(np.zeros((3, 5)))],
+            'mef.fits': [fits.PrimaryHDU(), fits.ImageHDU(np.ones(3))],
+            'waiver.fits': [fits.PrimaryHDU(np.zeros(7, 'u1')), table],
+            'other.fits': [fits.PrimaryHDU(np.zeros(7)), fits.ImageHDU()],
+        }
+        for name, hdus in hduls.items():
+            fits.HDUList(hdus).writeto(self.temp(name))
+            with stpyfits.open(self.temp(name)) as f:
+                expected = F.isFits(f)
+            assert F.isFits(self.temp(name)) == expected
@@ -0,0 +1,108 @@
+import io
+import logging
+
+from stsci.tools import logutil
+
+
+class _RecordingHandler(logging.Handler):
+    def __init__(self):
+        logging.Handler.__init__(self)
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def _tee_logger(name, stream):
+    orig_logger_class = logging.getLoggerClass()
+    logging.setLoggerClass(logutil.StreamTeeLogger)
+    try:
+        logger = logging.getLogger(name)
+    finally:
+        logging.setLoggerClass(orig_logger_class)
+    logger.set_stream(stream)
+    return logger
+
+
+def _print_lines(tee, *lines):
+    for line in lines:
+        tee.write(line + '\n')
+
+
+def test_line_buffer():
+    stream = io.StringIO()
+    tee = _tee_logger(__name__ + '.line_buffer', stream)
+    tee.set_line_buffer(3, flush_interval=None)
+
+    handler = _RecordingHandler()
+    logging.getLogger(__name__).addHandler(handler)
+    try:
+        _print_lines(tee, 'one', 'two')
+        # lines are held back, along with their echo to the stream
+        assert handler.records == []
+        assert stream.getvalue() == ''
+
+        _print_lines(tee, 'three')
+        assert [r.getMessage() for r in handler.records] == [
+            'one', 'two', 'three']
+        assert stream.getvalue() == 'one\ntwo\nthree\n'
+
+        _print_lines(tee, 'four')
+        assert len(handler.records) == 3
+        tee.flush()
+        assert [r.getMessage() for r in handler.records][3:] == ['four']
+        assert stream.getvalue().endswith('four\n')
+    finally:
+        logging.getLogger(__name__).removeHandler(handler)
+        tee.set_line_buffer(1)
+
+    # records are still addressed to the place the lines came from
+    lineno = _print_lines.__code__.co_firstlineno + 2
+    for record in handler.records:
+        assert record.name == __name__
+        assert record.module == 'test_logutil'
+        assert record.funcName == '_print_lines'
+        assert record.lineno == lineno
+
+
+def test_create_logger_buffered(tmpdir):
+    filename = str(tmpdir.join('buffered.log'))
+    logger = logutil.create_logger(__name__ + '.buffered', filename=filename,
+                                   buffered=True)
+    try:
+        handler, = logger.handlers
+        assert isinstance(handler, logutil._BufferedFileHandler)
+
+        logger.info('first')
+        logger.info('second')
+        # records wait in the file buffer until flushed
+        with open(filename) as f:
+            assert f.read() == ''
+        handler.flush()
+        with open(filename) as f:
+            assert f.read() == 'INFO: first\nINFO: second\n'
+
+        logger.info('third')
+        handler.close()
+        with open(filename) as f:
+            assert f.read().endswith('INFO: third\n')
+    finally:
+        logger.removeHandler(handler)
+        handler.close()
+
+
+def test_create_logger_unbuffered(tmpdir):
+    filename = str(tmpdir.join('unbuffered.log'))
+    logger = logutil.create_logger(__name__ + '.unbuffered',
+                                   filename=filename)
+    try:
+        handler, = logger.handlers
+        assert type(handler) is logging.FileHandler
+
+        # every record is written out straight away
+        logger.info('first')
+        with open(filename) as f:
+            assert f.read() == 'INFO: first\n'
+    finally:
+        logger.removeHandler(handler)
+        handler.close()